@@ -26,39 +26,296 @@
 # 256 xterm color sheet in RGB converted from
 # https://www.ditig.com/256-colors-cheat-sheet#list-of-colors
 
+import io
 import os
 import sys
-import termios
+import time
+from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
 from select import select
-from .ansi_codes import ESCAPE, CODES, COLORS_FG, COLORS_BK
+
+try:
+    import termios
+except ImportError:
+    # Windows, where only the virtual.Terminal subclass can be used
+    termios = None
+
+from .ansi_codes import CODES
+from .capabilities import detect, get_capabilities
+from .cursor import move_cursor
+from .width import clip, text_width
+from .sgr import (
+    sgr_transition,
+    degrade,
+    COLOR_24BIT,
+    color_256,
+    color_24bit,
+    BOLD,
+    ITALIC,
+    UNDERLINE,
+    BLINK,
+    REVERSE,
+    INVISIBLE,
+    CROSSED,
+)
 
 
 class Terminal:
-    def __init__(self):
+    def __init__(self, input_fd=None, output_fd=None, caps=None):
+        # Without fds, the terminal uses sys.stdin and sys.stdout.
+        # caps (capabilities.Capabilities) replaces the detected ones, for remote terminals.
+        self.input_fd = input_fd
+        self.output_fd = output_fd
+        self.encoding = "utf-8"
         self.fg = None
         self.bk = None
-        self.havecolor = 1
+        self.attrs = 0
+        # Last (fg, bk, attrs) sent to the terminal, None when unknown
+        self.sgr = None
+        self._sgr_pending = False
+        # Cursor position (column, line), 1 based, only tracked inside frames
+        self.cursor = None
+        self._saved_cursor = None
+        # (top, bottom) lines of the scroll region, None when not set
+        self.scroll_region = None
+        self._input = None
+        self.caps = caps if caps is not None else self._detect()
+        # 24, 8, 4 or 0 bits: richer colors are mapped to the nearest available one
+        self.color_depth = self.caps.color_depth
+        self.havecolor = 1 if self.color_depth else 0
         self.dotitles = 1
-        self.fd = sys.stdin.fileno()
-        self.new_term = termios.tcgetattr(self.fd)
-        self.old_term = termios.tcgetattr(self.fd)
-        self.new_term[3] = self.new_term[3] & ~termios.ICANON & ~termios.ECHO
-        self.ncolumns = 80
-        self.nlines = 24
-        self.type = os.environ.get("TERM", "UNKNOWN-ANSI")
+        self._open_input()
+        self.ncolumns = self.caps.columns
+        self.nlines = self.caps.lines
+        self.type = self.caps.term
         self.new_windows_terminal = False
+        # Output buffering (see begin_frame)
+        self.high_water = 65536
+        self._frame = None
+        self._frame_size = 0
+        self._frame_depth = 0
+        # metrics.Metrics, see enable_metrics
+        self.metrics = None
+        # recording.Recorder, see start_recording
+        self.recorder = None
+
+    def _detect(self):
+        if self.output_fd is not None:
+            return detect(self.output_fd)
+        return get_capabilities()
+
+    def _open_input(self):
+        if self.input_fd is None:
+            self.fd = sys.stdin.fileno()
+        else:
+            self.fd = self.input_fd
+        try:
+            self.new_term = termios.tcgetattr(self.fd)
+            self.old_term = termios.tcgetattr(self.fd)
+        except termios.error:
+            if self.input_fd is None:
+                raise
+            # A socket or pipe has no terminal modes
+            self.new_term = self.old_term = None
+            return
+        self.new_term[3] = self.new_term[3] & ~termios.ICANON & ~termios.ECHO
+
+    def write(self, text):
+        if self.metrics is not None:
+            self.metrics.write(text)
+        frame = self._frame
+        if frame is None:
+            if self.recorder is not None:
+                self.recorder.write(text)
+            self._send(text)
+        else:
+            frame.append(text)
+            self._frame_size += len(text)
+            if self._frame_size >= self.high_water:
+                self._flush_frame()
+
+    def _send(self, text):
+        # Output outside frames
+        if self.output_fd is not None:
+            self._write_fd(text)
+        else:
+            sys.stdout.write(text)
+            if self.metrics is not None:
+                self.metrics.bytes += len(text.encode(sys.stdout.encoding or "utf-8", "replace"))
+
+    def begin_frame(self):
+        """Starts collecting output in memory until the matching end_frame."""
+        if self._frame_depth == 0:
+            self._frame = []
+            self._frame_size = 0
+            # print and other writers may have moved the cursor
+            self.cursor = None
+        self._frame_depth += 1
+
+    def end_frame(self):
+        """Writes everything collected since begin_frame with as few system calls as possible."""
+        if self._frame_depth == 0:
+            return
+        self._frame_depth -= 1
+        if self._frame_depth == 0:
+            if self._sgr_pending:
+                self._emit_sgr()
+            self._flush_frame()
+            self._frame = None
+            self.cursor = None
+
+    @contextmanager
+    def frame(self):
+        self.begin_frame()
+        try:
+            yield self
+        finally:
+            self.end_frame()
+
+    def flush(self):
+        if self._frame is not None:
+            self._flush_frame()
+        elif self.output_fd is None:
+            if self.metrics is None:
+                sys.stdout.flush()
+            else:
+                start = time.perf_counter()
+                sys.stdout.flush()
+                self.metrics.flush(time.perf_counter() - start)
+
+    def _flush_frame(self):
+        frame = self._frame
+        if not frame:
+            return
+        text = "".join(frame)
+        frame.clear()
+        self._frame_size = 0
+        if self.recorder is not None:
+            self.recorder.write(text)
+        if self.metrics is None:
+            self._write_frame(text)
+        else:
+            start = time.perf_counter()
+            self._write_frame(text)
+            self.metrics.flush(time.perf_counter() - start)
+
+    def _write_frame(self, text):
+        if self.output_fd is not None:
+            self._write_fd(text)
+            return
+        try:
+            fd = sys.stdout.fileno()
+        except (AttributeError, ValueError, io.UnsupportedOperation):
+            # Replaced stdout (StringIO, captured output...)
+            sys.stdout.write(text)
+            if self.metrics is not None:
+                self.metrics.bytes += len(text.encode(sys.stdout.encoding or "utf-8", "replace"))
+            return
+        # Anything already written through sys.stdout must go first
+        sys.stdout.flush()
+        self._write_all(fd, text.encode(sys.stdout.encoding or "utf-8", "replace"))
+
+    def _write_fd(self, text):
+        self._write_all(self.output_fd, text.encode(self.encoding, "replace"))
+
+    def _write_all(self, fd, data):
+        view = memoryview(data)
+        while view:
+            try:
+                written = os.write(fd, view)
+            except BlockingIOError:
+                select([], [fd], [])
+                continue
+            if self.metrics is not None:
+                self.metrics.syscall(written)
+            view = view[written:]
+
+    def enable_metrics(self):
+        """Starts counting bytes, system calls, escape sequences and flush latency. Returns the metrics.Metrics."""
+        if self.metrics is None:
+            from .metrics import Metrics
+
+            self.metrics = Metrics()
+        return self.metrics
+
+    def disable_metrics(self):
+        if self.metrics is not None:
+            self.metrics.stop_dump()
+        self.metrics = None
+
+    def stats(self, reset=False):
+        """Returns the metrics counters as a dict, empty while metrics are disabled."""
+        if self.metrics is None:
+            return {}
+        return self.metrics.stats(reset)
+
+    def start_recording(self, file, **kwargs):
+        """Records everything written to file (a name or a text file object) in asciicast v2 format.
+
+        Returns the recording.Recorder.
+        """
+        from .recording import Recorder
+
+        self.stop_recording()
+        self.recorder = Recorder(file, self.columns(), self.lines(), term=self.caps.term, **kwargs)
+        return self.recorder
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
 
     def restore_buffered_mode(self):
-        termios.tcsetattr(self.fd, termios.TCSAFLUSH, self.old_term)
+        if self.old_term is not None:
+            termios.tcsetattr(self.fd, termios.TCSAFLUSH, self.old_term)
 
     def enable_unbuffered_input_mode(self):
-        termios.tcsetattr(self.fd, termios.TCSAFLUSH, self.new_term)
+        if self.new_term is not None:
+            termios.tcsetattr(self.fd, termios.TCSAFLUSH, self.new_term)
+
+    def _degrade(self, color):
+        return degrade(color, self.color_depth)
+
+    def _set_style(self, fg, bk, attrs):
+        # Inside a frame, style changes are merged and only sent before the next text
+        if self.color_depth < 24:
+            if not self.color_depth:
+                return
+            fg = self._degrade(fg)
+            bk = self._degrade(bk)
+        self.fg = fg
+        self.bk = bk
+        self.attrs = attrs
+        if self._frame is None:
+            self._emit_sgr()
+        else:
+            self._sgr_pending = True
+
+    def _emit_sgr(self):
+        self._sgr_pending = False
+        state = (self.fg, self.bk, self.attrs)
+        if state != self.sgr:
+            self.write(sgr_transition(self.sgr, state))
+            self.sgr = state
 
     def putch(self, ch):
-        sys.stdout.write(ch)
+        self.print(ch)
+
+    @property
+    def input(self):
+        if self._input is None:
+            from .keys import KeyInput
+
+            self._input = KeyInput(self.fd)
+        return self._input
 
     def getch(self):
-        return sys.stdin.read(1)
+        return self.input.getch()
+
+    def read_key(self, timeout=None):
+        """Returns the next keys.Key event (arrows, function keys...), None after timeout seconds."""
+        return self.input.read_key(timeout)
 
     def getche(self):
         ch = self.getch()
@@ -66,119 +323,442 @@ class Terminal:
         return ch
 
     def kbhit(self, timeout=0):
-        dr, dw, de = select([sys.stdin], [], [], timeout)
-        return dr != []
+        return self.input.kbhit(timeout)
+
+    def keys(self, escape_timeout=0.05):
+        """Returns an asynchronous iterator of keys.Key events: async for key in term.keys()"""
+        from .keys import KeyReader
+
+        return KeyReader(self.fd, escape_timeout)
+
+    def enable_bracketed_paste(self):
+        self.write(CODES["bracketed_paste_on"])
+
+    def disable_bracketed_paste(self):
+        self.write(CODES["bracketed_paste_off"])
 
     def no_colors(self):
         self.havecolor = 0
+        self.color_depth = 0
 
     def set_color(self, fg=None, bk=None):
-        if fg is not None:
-            sys.stdout.write(ESCAPE + COLORS_FG[fg])
-        if bk is not None:
-            sys.stdout.write(ESCAPE + COLORS_BK[bk])
+        if fg is not None and fg < 8:
+            # Normal COLORS_FG codes start with a reset ("0;31m")
+            self._set_style(fg, bk, 0)
+        elif fg is not None:
+            # Bright ones only add bold ("1;31m"): bk and attrs are kept
+            self._set_style(fg, self.bk if bk is None else bk, (self.attrs | BOLD) if fg < 16 else self.attrs)
+        elif bk is not None:
+            self._set_style(self.fg, bk, self.attrs)
+
+    def set_style(self, fg=None, bk=None, attrs=0):
+        """Selects fg, bk and attrs (sgr.BOLD, UNDERLINE... flags) at once. (fg, bk, attrs) is the current style."""
+        if fg is not None and 8 <= fg < 16:
+            # Bright colors are bold ones, as in set_color
+            attrs |= BOLD
+        self._set_style(fg, bk, attrs)
 
     def set_title(self, title):
-        if self.type in ["xterm", "Eterm", "aterm", "rxvt", "xterm-color"]:
+        if self.caps.titles and self.output_fd is not None:
+            self.write("\x1b]1;\x07\x1b]2;" + str(title) + "\x07")
+        elif self.caps.titles:
             sys.stderr.write("\x1b]1;\x07\x1b]2;" + str(title) + "\x07")
             sys.stderr.flush()
 
     def cprint(self, fg, bk, text):
         self.set_color(fg, bk)
-        print(text, end="")
-
-    def print_at(self, x, y, text):
+        self.print(text)
+
+    def _append_segments(self, out, segments):
+        # Appends what cprint(fg, bk, text) would write for every segment to out.
+        # Colors are only looked at when they differ from the previous segment,
+        # and the SGR sequence is only added before text, when the state changed.
+        depth = self.color_depth
+        if not depth:
+            out.extend([text for fg, bk, text in segments])
+            return
+        fg, bk, attrs = self.fg, self.bk, self.attrs
+        state = (fg, bk, attrs)
+        sent = self.sgr
+        changed = state != sent
+        last_fg = last_bk = -1
+        degraded = {None: None}
+        append = out.append
+        for seg_fg, seg_bk, text in segments:
+            if seg_fg != last_fg or seg_bk != last_bk:
+                last_fg, last_bk = seg_fg, seg_bk
+                if seg_fg is not None and seg_fg < 8:
+                    fg, bk, attrs = seg_fg, seg_bk, 0
+                else:
+                    if seg_fg is not None:
+                        fg = seg_fg
+                        if seg_fg < 16:
+                            attrs |= BOLD
+                    if seg_bk is not None:
+                        bk = seg_bk
+                if depth < 24:
+                    for color in (fg, bk):
+                        if color not in degraded:
+                            degraded[color] = self._degrade(color)
+                    fg, bk = degraded[fg], degraded[bk]
+                state = (fg, bk, attrs)
+                changed = True
+            if text:
+                if changed:
+                    changed = False
+                    if state != sent:
+                        append(sgr_transition(sent, state))
+                        sent = state
+                append(text)
+        self.fg, self.bk, self.attrs = state
+        self.sgr = sent
+        self._sgr_pending = state != sent
+
+    def cprint_many(self, segments):
+        """Prints an iterable of (fg, bk, text) segments with a single write, like a cprint loop.
+
+        text must be a str. Colors repeated by consecutive segments are not sent again.
+        """
+        out = []
+        self._append_segments(out, segments)
+        self.write("".join(out))
+        self.cursor = None
+
+    def print_rows(self, rows, x=1, y=1):
+        """Prints rows on consecutive lines starting at x, y with a single write.
+
+        Every row is a str or a list of (fg, bk, text) segments as in cprint_many.
+        """
+        out = []
+        goto = CODES["gotoxy"]
+        for line, row in enumerate(rows, y):
+            out.append(goto % (line, x))
+            self._append_segments(out, ((None, None, row),) if isinstance(row, str) else row)
+        self.write("".join(out))
+        self.cursor = None
+
+    def xterm24bit_runs(self, colors, text=" ", foreground=False):
+        """Prints a character per 0xRRGGBB color, used as background (or foreground) color.
+
+        colors can also be a NumPy array of packed colors or of N x 3 RGB values.
+        text is a single character repeated for every color or a str with one character per color.
+        """
+        if hasattr(colors, "tolist"):
+            if colors.ndim == 2:
+                from .image import pack_rgb
+
+                colors = pack_rgb(colors)
+            colors = colors.tolist()
+        if len(text) == 1:
+            runs = ((color, text * len(list(group))) for color, group in groupby(colors))
+        elif len(text) == len(colors):
+            runs = (
+                (color, "".join([ch for _, ch in group])) for color, group in groupby(zip(colors, text), itemgetter(0))
+            )
+        else:
+            raise ValueError("text must be one character or one character per color")
+        depth = self.color_depth
+        if not depth:
+            self.write("".join([chars for color, chars in runs]))
+            self.cursor = None
+            return
+        self._emit_sgr()
+        fg, bk, attrs = self.sgr
+        out = []
+        append = out.append
+        for color, chars in runs:
+            color = COLOR_24BIT | color
+            if depth < 24:
+                color = self._degrade(color)
+            if foreground:
+                if color != fg:
+                    append(sgr_transition((fg, bk, attrs), (color, bk, attrs)))
+                    fg = color
+            elif color != bk:
+                append(sgr_transition((fg, bk, attrs), (fg, color, attrs)))
+                bk = color
+            append(chars)
+        self.write("".join(out))
+        self.fg, self.bk, self.attrs = self.sgr = (fg, bk, attrs)
+        self.cursor = None
+
+    def render(self, template, *args, **kwargs):
+        """Prints style markup: term.render("[bold red]ERR[/] {}", msg). See markup.py."""
+        from .markup import compile_markup, expand
+
+        if self.color_depth:
+            self._emit_sgr()
+        segments = compile_markup(template, (self.fg, self.bk, self.attrs), self.color_depth)
+        self.write(expand(segments, args, kwargs))
+        self.cursor = None
+
+    def print_at(self, x, y, text, width=None):
+        """Prints text at x, y. With width, text is clipped to that many cells."""
         self.gotoXY(x, y)
-        print(text, end="")
+        if width is not None:
+            text = clip(str(text), width)[0]
+        self.print(text)
 
     def print(self, text):
-        print(text, end="")
+        if self._sgr_pending:
+            self._emit_sgr()
+        text = str(text)
+        self.write(text)
+        if self.cursor is not None:
+            if text.isprintable():
+                x = self.cursor[0] + text_width(text)
+                self.cursor = (x, self.cursor[1]) if x <= self.columns() else None
+            else:
+                self.cursor = None
 
     def clear(self):
-        sys.stdout.write(CODES["clear"])
+        # The screen is cleared with the current background color
+        if self._sgr_pending:
+            self._emit_sgr()
+        self.write(CODES["clear"])
+
+    def clear_eol(self):
+        """Clears from the cursor to the end of the line with the current background color."""
+        if self._sgr_pending:
+            self._emit_sgr()
+        self.write(CODES["clear_eol"])
+
+    def clear_eos(self):
+        """Clears from the cursor to the end of the screen with the current background color."""
+        if self._sgr_pending:
+            self._emit_sgr()
+        self.write(CODES["clear_eos"])
+
+    def erase_chars(self, n):
+        """Clears n cells from the cursor without moving it."""
+        if n <= 0:
+            return
+        if self._sgr_pending:
+            self._emit_sgr()
+        if self.caps.erase_chars:
+            self.write(CODES["erase_chars"] % n)
+        else:
+            self.write(" " * n + CODES["move_left"] % n)
+
+    def repeat(self, ch, n):
+        """Prints ch n times, using REP (ESC[nb) when the terminal has it and it is shorter."""
+        if n <= 0:
+            return
+        if self.caps.repeat and n > 4 and len(ch) == 1 and ch.isprintable() and text_width(ch) == 1:
+            sequence = CODES["repeat"] % (n - 1)
+            if len(sequence) < n - 1:
+                if self._sgr_pending:
+                    self._emit_sgr()
+                self.write(ch + sequence)
+                if self.cursor is not None:
+                    x = self.cursor[0] + n
+                    self.cursor = (x, self.cursor[1]) if x <= self.columns() else None
+                return
+        self.print(ch * n)
+
+    def fill_rect(self, x, y, width, height, ch=" ", fg=None, bk=None):
+        """Paints width x height cells from x, y (1 based) with ch in fg, bk. The current colors are kept."""
+        columns = self.columns()
+        width = min(width, columns - x + 1)
+        height = min(height, self.lines() - y + 1)
+        if width <= 0 or height <= 0:
+            return
+        saved = (self.fg, self.bk, self.attrs)
+        # Erasing is only the same as writing spaces if erased cells take the background color
+        erase = ch == " " and (bk is None or self.caps.bce)
+        with self.frame():
+            self._set_style(fg, bk, BOLD if fg is not None and 8 <= fg < 16 else 0)
+            for line in range(y, y + height):
+                self.gotoXY(x, line)
+                if erase and x + width > columns:
+                    self.clear_eol()
+                elif erase and self.caps.erase_chars:
+                    self.erase_chars(width)
+                else:
+                    self.repeat(ch, width)
+            self._set_style(*saved)
+
+    def clear_rect(self, x, y, width, height):
+        """Clears width x height cells from x, y (1 based) to the default background."""
+        self.fill_rect(x, y, width, height)
 
     def gotoXY(self, x, y):
-        sys.stdout.write(CODES["gotoxy"] % (y, x))
+        if self._frame is None:
+            self.write(CODES["gotoxy"] % (y, x))
+        else:
+            # ESC[y;xH clamps the position to the screen
+            target = (min(max(int(x), 1), self.columns()), min(max(int(y), 1), self.lines()))
+            self.write(move_cursor(self.cursor, target, region=self.scroll_region))
+            self.cursor = target
 
     def save_pos(self):
-        sys.stdout.write(CODES["save"])
+        self.write(CODES["save"])
+        self._saved_cursor = self.cursor
 
     def restore_pos(self):
-        sys.stdout.write(CODES["restore"])
+        self.write(CODES["restore"])
+        self.cursor = self._saved_cursor if self._frame is not None else None
 
     def reset(self):
-        sys.stdout.write(CODES["reset"])
+        self._set_style(None, None, 0)
+
+    def _move_by(self, dx, dy):
+        x, y = self.cursor
+        self.cursor = (min(max(x + dx, 1), self.columns()), min(max(y + dy, 1), self.lines()))
 
     def move_left(self, c=1):
-        sys.stdout.write(CODES["move_left"] % c)
+        self.write(CODES["move_left"] % c)
+        if self.cursor is not None:
+            self._move_by(-c, 0)
 
     def move_right(self, c=1):
-        sys.stdout.write(CODES["move_right"] % c)
+        self.write(CODES["move_right"] % c)
+        if self.cursor is not None:
+            self._move_by(c, 0)
 
     def move_up(self, c=1):
-        sys.stdout.write(CODES["move_up"] % c)
+        self.write(CODES["move_up"] % c)
+        if self.scroll_region is not None:
+            # Stops at the top margin if the cursor is in the region
+            self.cursor = None
+        elif self.cursor is not None:
+            self._move_by(0, -c)
 
     def move_down(self, c=1):
-        sys.stdout.write(CODES["move_down"] % c)
+        self.write(CODES["move_down"] % c)
+        if self.scroll_region is not None:
+            self.cursor = None
+        elif self.cursor is not None:
+            self._move_by(0, c)
+
+    def set_scroll_region(self, top, bottom):
+        """Limits scrolling to lines top - bottom (1 based, inclusive). Moves the cursor to 1, 1."""
+        self.write(CODES["scroll_region"] % (top, bottom))
+        self.scroll_region = (top, bottom)
+        if self._frame is not None:
+            self.cursor = (1, 1)
+
+    def reset_scroll_region(self):
+        self.write(CODES["reset_scroll_region"])
+        self.scroll_region = None
+        if self._frame is not None:
+            self.cursor = (1, 1)
+
+    def insert_lines(self, n=1):
+        """Inserts n blank lines at the cursor line, moving the lines below it down to the scroll region bottom."""
+        self.write(CODES["insert_line"] % n)
+        if self.cursor is not None:
+            self.cursor = (1, self.cursor[1])
+
+    def delete_lines(self, n=1):
+        """Deletes n lines from the cursor line, moving the lines below it up."""
+        self.write(CODES["delete_line"] % n)
+        if self.cursor is not None:
+            self.cursor = (1, self.cursor[1])
+
+    def scroll_up(self, n=1):
+        """Scrolls the scroll region n lines up."""
+        self.write(CODES["scroll_up"] % n)
+
+    def scroll_down(self, n=1):
+        self.write(CODES["scroll_down"] % n)
 
     def columns(self):
+        if self.output_fd is not None:
+            return self.ncolumns
         return int(os.getenv("COLUMNS", self.ncolumns))
 
     def lines(self):
+        if self.output_fd is not None:
+            return self.nlines
         return int(os.getenv("LINES", self.nlines))
 
+    def resize(self, columns, lines):
+        """Sets the size, for terminals bound to fds (after SIGWINCH or a remote resize)."""
+        self.ncolumns = columns
+        self.nlines = lines
+
     def underline(self):
-        sys.stdout.write(CODES["underline"])
+        self._set_style(self.fg, self.bk, self.attrs | UNDERLINE)
 
     def underline_off(self):
-        sys.stdout.write(CODES["underline_off"])
+        self._set_style(self.fg, self.bk, self.attrs & ~UNDERLINE)
 
     def blink(self):
-        sys.stdout.write(CODES["blink"])
+        self._set_style(self.fg, self.bk, self.attrs | BLINK)
 
     def blink_off(self):
-        sys.stdout.write(CODES["blink_off"])
+        self._set_style(self.fg, self.bk, self.attrs & ~BLINK)
 
     def reverse(self):
-        sys.stdout.write(CODES["reverse"])
+        self._set_style(self.fg, self.bk, self.attrs | REVERSE)
 
     def reverse_off(self):
-        sys.stdout.write(CODES["reverse_off"])
+        self._set_style(self.fg, self.bk, self.attrs & ~REVERSE)
 
     def italic(self):
-        sys.stdout.write(CODES["italic"])
+        self._set_style(self.fg, self.bk, self.attrs | ITALIC)
 
     def italic_off(self):
-        sys.stdout.write(CODES["italic_off"])
+        self._set_style(self.fg, self.bk, self.attrs & ~ITALIC)
 
     def crossed(self):
-        sys.stdout.write(CODES["crossed"])
+        self._set_style(self.fg, self.bk, self.attrs | CROSSED)
 
     def crossed_off(self):
-        sys.stdout.write(CODES["crossed_off"])
+        self._set_style(self.fg, self.bk, self.attrs & ~CROSSED)
 
     def invisible(self):
-        sys.stdout.write(CODES["invisible"])
+        self._set_style(self.fg, self.bk, self.attrs | INVISIBLE)
 
     def reset_colors(self):
-        self.default_background()
-        self.default_foreground
-        self.reset()
+        self._set_style(None, None, 0)
 
     def xterm256_set_fg_color(self, color):
-        sys.stdout.write(ESCAPE + "38;5;%dm" % color)
+        self._set_style(color_256(color), self.bk, self.attrs)
 
     def xterm24bit_set_fg_color(self, r, g, b):
-        sys.stdout.write(ESCAPE + "38;2;%d;%d;%dm" % (r, g, b))
+        self._set_style(color_24bit(r, g, b), self.bk, self.attrs)
 
     def xterm256_set_bk_color(self, color):
-        sys.stdout.write(ESCAPE + "48;5;%dm" % color)
+        self._set_style(self.fg, color_256(color), self.attrs)
 
     def xterm24bit_set_bk_color(self, r, g, b):
-        sys.stdout.write(ESCAPE + "48;2;%d;%d;%dm" % (r, g, b))
+        self._set_style(self.fg, color_24bit(r, g, b), self.attrs)
 
     def default_foreground(self):
-        sys.stdout.write(ESCAPE + "39m")
+        self._set_style(None, self.bk, self.attrs)
+
+    def draw_image(self, image, x, y):
+        """Draws a HxWx3 uint8 RGB array (requires NumPy), two pixel lines per text line."""
+        from .image import crop, render_half_blocks, render_half_blocks_palette
+
+        if not self.color_depth:
+            return
+        image, x, y = crop(image, x, y, self.columns(), self.lines())
+        self._emit_sgr()
+        if self.color_depth < 24:
+            text, state = render_half_blocks_palette(image, x, y, self.color_depth, self.sgr)
+            if text:
+                self.write(text)
+                self.sgr = state
+                self.cursor = None
+                self._emit_sgr()
+            return
+        fg, bk, attrs = self.sgr
+        text, fg, bk = render_half_blocks(
+            image,
+            x,
+            y,
+            fg & 0xFFFFFF if fg is not None and fg >= COLOR_24BIT else None,
+            bk & 0xFFFFFF if bk is not None and bk >= COLOR_24BIT else None,
+        )
+        if not text:
+            return
+        self.write(text)
+        self.sgr = (COLOR_24BIT | fg, COLOR_24BIT | bk, attrs)
+        self.cursor = None
+        self._emit_sgr()
 
     def default_background(self):
-        sys.stdout.write(ESCAPE + "49m")
+        self._set_style(self.fg, None, self.attrs)
@@ -33,6 +33,9 @@ CODES = {
     "bold": ESCAPE + "1m",
     "clear": ESCAPE + "2J",
     "clear_eol": ESCAPE + "K",
+    "clear_eos": ESCAPE + "J",
+    "erase_chars": ESCAPE + "%dX",
+    "repeat": ESCAPE + "%db",
     "gotoxy": ESCAPE + "%d;%dH",
     "move_up": ESCAPE + "%dA",
     "move_down": ESCAPE + "%dB",
@@ -52,6 +55,14 @@ CODES = {
     "italic_off": ESCAPE + "23m",
     "crossed": ESCAPE + "9m",
     "crossed_off": ESCAPE + "29m",
+    "scroll_region": ESCAPE + "%d;%dr",
+    "reset_scroll_region": ESCAPE + "r",
+    "insert_line": ESCAPE + "%dL",
+    "delete_line": ESCAPE + "%dM",
+    "scroll_up": ESCAPE + "%dS",
+    "scroll_down": ESCAPE + "%dT",
+    "bracketed_paste_on": ESCAPE + "?2004h",
+    "bracketed_paste_off": ESCAPE + "?2004l",
 }
 
 COLORS_FG = {
@@ -91,3 +102,67 @@ COLORS_BK = {
     11: "106m",
     15: "107m",
 }
+
+# xterm 256 color palette in RGB, same as win.Terminal.WT_COLORS_256
+_CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+XTERM256_RGB = (
+    (
+        (0, 0, 0),
+        (128, 0, 0),
+        (0, 128, 0),
+        (128, 128, 0),
+        (0, 0, 128),
+        (128, 0, 128),
+        (0, 128, 128),
+        (192, 192, 192),
+        (128, 128, 128),
+        (255, 0, 0),
+        (0, 255, 0),
+        (255, 255, 0),
+        (0, 0, 255),
+        (255, 0, 255),
+        (0, 255, 255),
+        (255, 255, 255),
+    )
+    + tuple((_CUBE_LEVELS[n // 36], _CUBE_LEVELS[n // 6 % 6], _CUBE_LEVELS[n % 6]) for n in range(216))
+    + tuple((8 + 10 * n,) * 3 for n in range(24))
+)
+
+# Precomputed sequences, so hot paths are a single lookup
+
+# XTERM256_FG[n] == ESCAPE + "38;5;%dm" % n
+XTERM256_FG = tuple(ESCAPE + "38;5;%dm" % n for n in range(256))
+XTERM256_BK = tuple(ESCAPE + "48;5;%dm" % n for n in range(256))
+XTERM256_FG_BYTES = tuple(s.encode("ascii") for s in XTERM256_FG)
+XTERM256_BK_BYTES = tuple(s.encode("ascii") for s in XTERM256_BK)
+
+# COLORS_FG_BK[fg][bk] == ESCAPE + COLORS_FG[fg] + ESCAPE + COLORS_BK[bk] as one sequence
+COLORS_FG_BK = tuple(tuple(ESCAPE + COLORS_FG[fg][:-1] + ";" + COLORS_BK[bk] for bk in range(16)) for fg in range(16))
+COLORS_FG_BK_BYTES = tuple(tuple(s.encode("ascii") for s in row) for row in COLORS_FG_BK)
+
+# 24 bit sequences are built on first use. The caches are emptied when they grow past XTERM24BIT_CACHE_SIZE.
+XTERM24BIT_CACHE_SIZE = 65536
+_xterm24bit_fg = {}
+_xterm24bit_bk = {}
+
+
+def xterm24bit_fg(rgb):
+    """Returns ESCAPE + "38;2;r;g;bm" for rgb packed as 0xRRGGBB."""
+    try:
+        return _xterm24bit_fg[rgb]
+    except KeyError:
+        if len(_xterm24bit_fg) >= XTERM24BIT_CACHE_SIZE:
+            _xterm24bit_fg.clear()
+        s = _xterm24bit_fg[rgb] = ESCAPE + "38;2;%d;%d;%dm" % (rgb >> 16, (rgb >> 8) & 0xFF, rgb & 0xFF)
+        return s
+
+
+def xterm24bit_bk(rgb):
+    """Returns ESCAPE + "48;2;r;g;bm" for rgb packed as 0xRRGGBB."""
+    try:
+        return _xterm24bit_bk[rgb]
+    except KeyError:
+        if len(_xterm24bit_bk) >= XTERM24BIT_CACHE_SIZE:
+            _xterm24bit_bk.clear()
+        s = _xterm24bit_bk[rgb] = ESCAPE + "48;2;%d;%d;%dm" % (rgb >> 16, (rgb >> 8) & 0xFF, rgb & 0xFF)
+        return s
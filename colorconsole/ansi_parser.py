@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Streaming parser for text with ANSI escape sequences (str or bytes).
+#
+# Chunks can be split anywhere: an incomplete sequence at the end of a chunk
+# is kept until the next one. Chunks without ESC are returned as they are,
+# and the sequences of the other ones are found by compiled regular
+# expressions, so plain text costs a single scan.
+
+import codecs
+import re
+from collections import namedtuple
+
+from .width import text_width
+
+Text = namedtuple("Text", ["text"])
+CSI = namedtuple("CSI", ["params", "intermediates", "final", "data"])
+# params is a list of ints, [0] for ESC[m
+SGR = namedtuple("SGR", ["params", "data"])
+# Operating system command (ESC ] ... BEL), also used for DCS, SOS, PM and APC strings
+OSC = namedtuple("OSC", ["text", "data"])
+Escape = namedtuple("Escape", ["data"])
+
+_SEQUENCE = (
+    r"\x1b(?:\[(?P<params>[0-?]*)(?P<intermediates>[ -/]*)(?P<final>[@-~])"
+    r"|[\]PX^_](?P<string>[^\x07\x1b]*)(?:\x07|\x1b\\)"
+    r"|[ -/]*[0-~])"
+)
+# Same as _SEQUENCE without groups, which is faster for stripping
+_STRIP = r"\x1b(?:\[[0-?]*[ -/]*[@-~]|[\]PX^_][^\x07\x1b]*(?:\x07|\x1b\\)|[ -/]*[0-~])"
+_PARTIAL = r"\x1b(?:\[[0-?]*[ -/]*|[ -/]*)\Z"
+_STRING_STARTS = ("\x1b]", "\x1bP", "\x1bX", "\x1b^", "\x1b_")
+
+
+class _Syntax:
+    # Compiled patterns and constants for str or bytes
+    def __init__(self, kind):
+        if kind is str:
+            self.convert = lambda s: s
+        else:
+            self.convert = lambda s: s.encode("latin-1")
+        c = self.convert
+        self.esc = c("\x1b")
+        self.empty = c("")
+        self.bel = c("\x07")
+        self.st = c("\x1b\\")
+        self.sequence = re.compile(c(_SEQUENCE))
+        self.split = re.compile(c(_STRIP)).split
+        self.tokens = re.compile(c("(" + _STRIP + ")")).split
+        self.partial = re.compile(c(_PARTIAL))
+        self.string_starts = tuple(c(s) for s in _STRING_STARTS)
+
+
+_SYNTAX = {str: _Syntax(str), bytes: _Syntax(bytes)}
+
+
+def _text(value):
+    return value if isinstance(value, str) else value.decode("utf-8", "replace")
+
+
+def _sequence_event(match):
+    data = match.group(0)
+    final = match.group("final")
+    if final is not None:
+        params = _text(match.group("params"))
+        intermediates = _text(match.group("intermediates"))
+        final = _text(final)
+        if final == "m" and not intermediates and not (params and params[0] in "<=>?"):
+            return SGR([int(p) if p.isdigit() else 0 for p in params.replace(":", ";").split(";")], data)
+        return CSI(params, intermediates, final, data)
+    string = match.group("string")
+    if string is not None:
+        return OSC(_text(string), data)
+    return Escape(data)
+
+
+class AnsiParser:
+    """Splits a stream of chunks (all str or all bytes) into text and escape sequences."""
+
+    def __init__(self):
+        self.pending = None
+        # UTF-8 decoder for visible_length, keeps characters split between chunks
+        self._decoder = None
+
+    def _complete(self, chunk):
+        # Returns (syntax, data) with the complete part of pending + chunk, keeping the rest pending
+        syntax = _SYNTAX[type(chunk)]
+        if self.pending:
+            chunk = self.pending + chunk
+        self.pending = None
+        esc = chunk.rfind(syntax.esc)
+        if esc < 0:
+            return syntax, chunk
+        cut = len(chunk)
+        if syntax.partial.match(chunk, esc):
+            cut = esc
+        # An unterminated string (OSC, DCS...) keeps everything from its start
+        start = max(chunk.rfind(s) for s in syntax.string_starts)
+        if start >= 0 and chunk.find(syntax.bel, start) < 0 and chunk.find(syntax.st, start) < 0:
+            cut = min(cut, start)
+        if cut < len(chunk):
+            self.pending = chunk[cut:]
+            chunk = chunk[:cut]
+        return syntax, chunk
+
+    def strip(self, chunk):
+        """Returns the text of chunk without escape sequences."""
+        syntax, data = self._complete(chunk)
+        if syntax.esc not in data:
+            return data
+        return syntax.empty.join(syntax.split(data))
+
+    def visible_length(self, chunk):
+        """Returns the number of cells the text of chunk takes on the screen. bytes are decoded as UTF-8.
+
+        Wide characters count 2 cells, control and combining characters 0.
+        """
+        text = self.strip(chunk)
+        if isinstance(text, bytes):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+            text = self._decoder.decode(text)
+        return text_width(text)
+
+    def split(self, chunk):
+        """Returns [text, sequence, text, ..., text]: odd items are complete escape sequences."""
+        syntax, data = self._complete(chunk)
+        if syntax.esc not in data:
+            return [data]
+        return syntax.tokens(data)
+
+    def feed(self, chunk):
+        """Returns the list of Text, SGR, CSI, OSC and Escape events of chunk."""
+        return list(self.events(chunk))
+
+    def events(self, chunk):
+        syntax, data = self._complete(chunk)
+        if syntax.esc not in data:
+            if data:
+                yield Text(data)
+            return
+        position = 0
+        for match in syntax.sequence.finditer(data):
+            start = match.start()
+            if start > position:
+                yield Text(data[position:start])
+            yield _sequence_event(match)
+            position = match.end()
+        if position < len(data):
+            yield Text(data[position:])
+
+    def flush(self):
+        """Returns what is still pending (an incomplete sequence) and forgets it."""
+        pending = self.pending
+        self.pending = None
+        return pending
+
+
+def strip(text):
+    """Removes the escape sequences of a complete str or bytes."""
+    syntax = _SYNTAX[type(text)]
+    if syntax.esc not in text:
+        return text
+    return syntax.empty.join(syntax.split(text))
+
+
+def parse_sequence(data):
+    """Returns the SGR, CSI, OSC or Escape event of a single complete escape sequence."""
+    return _sequence_event(_SYNTAX[type(data)].sequence.match(data))
+
+
+def visible_length(text):
+    """Returns the number of cells a complete str or bytes (UTF-8) takes on the screen."""
+    text = strip(text)
+    if isinstance(text, bytes):
+        text = text.decode("utf-8", "replace")
+    return text_width(text)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Throughput benchmarks:
+#
+#   python -m colorconsole.bench [-n 100000] [--targets devnull,pipe,pty]
+#                                [--cases set_color,...] [-o results.json]
+#
+# Prints JSON with calls/s and bytes/s for every case and target, so results
+# of different releases can be compared.
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+from .cases import CASES
+from .targets import TARGETS
+
+
+def _version():
+    try:
+        from importlib.metadata import version
+
+        return version("colorconsole")
+    except Exception:
+        return "unknown"
+
+
+def run_case(name, target_name, number, repeat):
+    function = CASES[name]
+    n = max(1, number // function.scale)
+    best = None
+    for _ in range(repeat):
+        target = TARGETS[target_name]() if target_name else None
+        term = target.open() if target else None
+        try:
+            start = time.perf_counter()
+            calls = function(term, n)
+            if term is not None:
+                term.flush()
+            elapsed = time.perf_counter() - start
+        finally:
+            if target:
+                target.close()
+        if best is None or elapsed < best[0]:
+            size = term.bytes if term is not None else getattr(function, "bytes", 0)
+            syscalls = term.syscalls if term is not None else 0
+            best = (elapsed, calls, size, syscalls)
+    elapsed, calls, size, syscalls = best
+    return {
+        "case": name,
+        "target": target_name,
+        "calls": calls,
+        "seconds": elapsed,
+        "calls_per_s": calls / elapsed,
+        "bytes": size,
+        "bytes_per_s": size / elapsed,
+        "syscalls": syscalls,
+    }
+
+
+def run(cases=None, targets=None, number=100000, repeat=3):
+    results = []
+    for name in cases or CASES:
+        if not CASES[name].target:
+            results.append(run_case(name, None, number, repeat))
+            continue
+        for target_name in targets or TARGETS:
+            results.append(run_case(name, target_name, number, repeat))
+    return {
+        "colorconsole": _version(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "number": number,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m colorconsole.bench", description="colorconsole benchmarks")
+    parser.add_argument("-n", "--number", type=int, default=100000, help="iterations per case")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="runs per case, the best one is kept")
+    parser.add_argument("--cases", help="comma separated, from: " + ", ".join(CASES))
+    parser.add_argument("--targets", help="comma separated, from: " + ", ".join(TARGETS))
+    parser.add_argument("-o", "--output", help="JSON file (stdout by default)")
+    args = parser.parse_args(argv)
+    cases = args.cases.split(",") if args.cases else None
+    targets = args.targets.split(",") if args.targets else None
+    for name in cases or ():
+        if name not in CASES:
+            parser.error("unknown case: " + name)
+    for name in targets or ():
+        if name not in TARGETS:
+            parser.error("unknown target: " + name)
+    report = run(cases, targets, args.number, args.repeat)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Benchmark cases. Each one gets a terminal and a number of iterations and
+# returns how many API calls it made. Cases marked with target=False do not
+# write to a terminal (input decoding) and run once, not once per target.
+
+from ..keys import KeyDecoder
+from ..screen import Screen
+
+CASES = {}
+
+
+def case(name, target=True, scale=1):
+    # scale divides the number of iterations, for the slow cases
+    def register(function):
+        function.target = target
+        function.scale = scale
+        CASES[name] = function
+        return function
+
+    return register
+
+
+@case("set_color")
+def set_color(term, n):
+    for i in range(n):
+        term.set_color(i & 15, (i >> 4) & 7)
+    return n
+
+
+@case("gotoXY")
+def goto_xy(term, n):
+    for i in range(n):
+        term.gotoXY(i % 80 + 1, i % 24 + 1)
+    return n
+
+
+@case("cprint")
+def cprint(term, n):
+    for i in range(n):
+        term.cprint(i & 15, 0, "colorconsole")
+    return n
+
+
+@case("cprint_many")
+def cprint_many(term, n):
+    # The cprint case as a single batch call
+    term.cprint_many([(i & 15, 0, "colorconsole") for i in range(n)])
+    return n
+
+
+@case("xterm256_set_fg_color")
+def xterm256(term, n):
+    for i in range(n):
+        term.xterm256_set_fg_color(i & 0xFF)
+    return n
+
+
+@case("xterm24bit_set_fg_color")
+def xterm24bit(term, n):
+    for i in range(n):
+        term.xterm24bit_set_fg_color(i & 0xFF, (i >> 8) & 0xFF, 128)
+    return n
+
+
+@case("xterm24bit_runs")
+def xterm24bit_runs(term, n):
+    # One background color per cell, in rows of 64 cells as samples/example3.py draws them
+    for start in range(0, n, 64):
+        term.xterm24bit_runs([(i << 8) | 128 for i in range(start, min(start + 64, n))])
+    return n
+
+
+@case("frame_print_at")
+def frame_print_at(term, n):
+    # The same calls as cprint plus gotoXY, written as frames of 100 calls
+    for start in range(0, n, 100):
+        with term.frame():
+            for i in range(start, min(start + 100, n)):
+                term.set_color(i & 15, 0)
+                term.print_at(i % 70 + 1, i % 24 + 1, "colorconsole")
+    return n
+
+
+@case("screen_full_redraw", scale=1000)
+def screen_full_redraw(term, n):
+    # Every cell changes on every frame: n is the number of frames
+    screen = Screen(term, 80, 24)
+    line = "".join(chr(33 + i % 94) for i in range(80 + 94))
+    for frame in range(n):
+        for y in range(24):
+            screen.fg = (frame + y) & 15
+            screen.print_at(0, y, line[(frame + y) % 94 :][:80])
+        screen.flush()
+    return n
+
+
+INPUT = (
+    b"hello world "
+    + b"\x1b[A\x1b[B\x1b[C\x1b[D"
+    + b"\x1b[1;5A\x1b[15~\x1bOP"
+    + "ação ".encode("utf-8")
+    + b"\x1b[200~pasted text\x1b[201~"
+    + b"\x01\x7f\r"
+)
+
+
+@case("key_decoding", target=False, scale=10)
+def key_decoding(term, n):
+    # n chunks of INPUT, fed in 4 KB reads; returns the number of keys
+    decoder = KeyDecoder()
+    data = INPUT * n
+    keys = 0
+    for start in range(0, len(data), 4096):
+        keys += len(decoder.feed(data[start : start + 4096]))
+    keys += len(decoder.flush())
+    key_decoding.bytes = len(data)
+    return keys
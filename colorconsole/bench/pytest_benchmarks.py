@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# The benchmark cases for pytest-benchmark:
+#
+#   pytest colorconsole/bench/pytest_benchmarks.py --benchmark-json=results.json
+#
+# The file name does not match test_*.py, so normal test runs skip it.
+
+import pytest
+
+from .cases import CASES
+from .targets import TARGETS
+
+NUMBER = 10000
+
+
+@pytest.mark.parametrize("target_name", list(TARGETS))
+@pytest.mark.parametrize("name", [name for name, function in CASES.items() if function.target])
+def test_output(benchmark, name, target_name):
+    function = CASES[name]
+    target = TARGETS[target_name]()
+    term = target.open()
+    try:
+        benchmark(function, term, max(1, NUMBER // function.scale))
+        term.flush()
+    finally:
+        target.close()
+
+
+@pytest.mark.parametrize("name", [name for name, function in CASES.items() if not function.target])
+def test_input(benchmark, name):
+    function = CASES[name]
+    benchmark(function, None, max(1, NUMBER // function.scale))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Output targets for the benchmarks: /dev/null, a pipe and a pseudo terminal.
+#
+# Pipes and ptys are emptied by a reader thread, which also counts the bytes
+# that went through.
+
+import os
+import threading
+
+from .. import ansi
+
+
+class BenchTerminal(ansi.Terminal):
+    """ansi.Terminal writing to output_fd that counts bytes and write calls."""
+
+    def __init__(self, output_fd, input_fd=None):
+        super().__init__(output_fd if input_fd is None else input_fd, output_fd)
+        # Benchmarks measure the color paths, whatever the target says
+        self.color_depth = 24
+        self.bytes = 0
+        self.syscalls = 0
+
+    def _write_fd(self, text):
+        data = text.encode(self.encoding, "replace")
+        self.bytes += len(data)
+        self.syscalls += 1
+        self._write_all(self.output_fd, data)
+
+
+class Target:
+    name = None
+
+    def open(self):
+        """Returns a BenchTerminal writing to the target."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class DevNull(Target):
+    name = "devnull"
+
+    def open(self):
+        self.fd = os.open(os.devnull, os.O_WRONLY)
+        return BenchTerminal(self.fd)
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _drain(fd, counter):
+    while True:
+        try:
+            data = os.read(fd, 65536)
+        except OSError:
+            return
+        if not data:
+            return
+        counter[0] += len(data)
+
+
+class _Reader(Target):
+    def _start_reader(self, fd):
+        self.received = [0]
+        self.thread = threading.Thread(target=_drain, args=(fd, self.received), daemon=True)
+        self.thread.start()
+
+
+class Pipe(_Reader):
+    name = "pipe"
+
+    def open(self):
+        self.read_fd, self.fd = os.pipe()
+        self._start_reader(self.read_fd)
+        return BenchTerminal(self.fd)
+
+    def close(self):
+        os.close(self.fd)
+        self.thread.join()
+        os.close(self.read_fd)
+
+
+class Pty(_Reader):
+    name = "pty"
+
+    def open(self):
+        import pty
+
+        self.master, self.fd = pty.openpty()
+        self._start_reader(self.master)
+        return BenchTerminal(self.fd)
+
+    def close(self):
+        os.close(self.fd)
+        # Reading the master fails with EIO once the slave is closed
+        self.thread.join()
+        os.close(self.master)
+
+
+TARGETS = {target.name: target for target in (DevNull, Pipe, Pty)}
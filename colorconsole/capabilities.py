@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Terminal capability detection.
+#
+# The environment (TERM, COLORTERM, NO_COLOR, FORCE_COLOR), terminfo and
+# whether stdout is a tty are checked once per process. Terminals read the
+# result as plain attributes. Remote terminals (sessions served over sockets
+# or ptys) are described by the client's TERM, see remote().
+
+import os
+import sys
+from collections import namedtuple
+
+TITLE_TERMINALS = ("xterm", "Eterm", "aterm", "rxvt", "xterm-color")
+
+# color_depth: 24 (true color), 8 (256 colors), 4 (16 colors) or 0 (no colors)
+# erase_chars: ESC[nX (ECH), repeat: ESC[nb (REP), bce: erased cells take the background color
+Capabilities = namedtuple(
+    "Capabilities",
+    ["term", "isatty", "color_depth", "titles", "columns", "lines", "erase_chars", "repeat", "bce"],
+    defaults=(False, False, False),
+)
+
+_capabilities = None
+# curses.setupterm only loads terminfo once per process: other terminal types
+# are judged by their names
+_setup_term = None
+
+
+def _terminfo(term, fd):
+    # Returns (colors, columns, lines, (ech, rep, bce)) from terminfo, -1 and False when unknown
+    global _setup_term
+    try:
+        import curses
+
+        if _setup_term is None:
+            curses.setupterm(term, fd)
+            _setup_term = term
+        elif term != _setup_term:
+            return -1, -1, -1, (False, False, False)
+        features = (bool(curses.tigetstr("ech")), bool(curses.tigetstr("rep")), curses.tigetflag("bce") > 0)
+        return curses.tigetnum("colors"), curses.tigetnum("cols"), curses.tigetnum("lines"), features
+    except Exception:
+        return -1, -1, -1, (False, False, False)
+
+
+def detect(stream=None, environ=None):
+    """Probes the terminal behind stream (sys.stdout by default) or a file descriptor.
+
+    Use get_capabilities for the cached result.
+    """
+    stream = sys.stdout if stream is None else stream
+    environ = os.environ if environ is None else environ
+    term = environ.get("TERM", "UNKNOWN-ANSI")
+    try:
+        fd = stream if isinstance(stream, int) else stream.fileno()
+        isatty = os.isatty(fd)
+    except (AttributeError, ValueError, OSError):
+        fd = -1
+        isatty = False
+    colors, columns, lines, (erase_chars, repeat, bce) = _terminfo(term, fd)
+    if isatty:
+        # The size of this terminal, terminfo only knows the default one
+        try:
+            columns, lines = os.get_terminal_size(fd)
+        except OSError:
+            pass
+
+    colorterm = environ.get("COLORTERM", "").lower()
+    if environ.get("NO_COLOR"):
+        color_depth = 0
+    elif not isatty and not environ.get("FORCE_COLOR"):
+        color_depth = 0
+    elif term == "dumb":
+        color_depth = 0
+    elif colorterm in ("truecolor", "24bit") or colors >= 1 << 24:
+        color_depth = 24
+    elif colors >= 256 or "256color" in term:
+        color_depth = 8
+    else:
+        color_depth = 4
+    return Capabilities(
+        term=term,
+        isatty=isatty,
+        color_depth=color_depth,
+        titles=term in TITLE_TERMINALS,
+        columns=columns if columns > 0 else 80,
+        lines=lines if lines > 0 else 24,
+        erase_chars=erase_chars,
+        repeat=repeat,
+        bce=bce,
+    )
+
+
+def remote(fd, term, color_depth=None, colorterm=""):
+    """Capabilities of a client terminal of type term (its TERM) served over fd, a socket or pty.
+
+    fd is not the client's tty, so colors follow term and colorterm (its COLORTERM).
+    color_depth, when given, overrides them.
+    """
+    caps = detect(fd, {"TERM": term, "COLORTERM": colorterm, "FORCE_COLOR": "1"})
+    if color_depth is not None:
+        caps = caps._replace(color_depth=color_depth)
+    return caps
+
+
+def get_capabilities(refresh=False):
+    """Returns the capabilities of the terminal behind sys.stdout, detected once per process."""
+    global _capabilities
+    if _capabilities is None or refresh:
+        _capabilities = detect()
+    return _capabilities
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Compact cell storage for screen buffers.
+#
+# A cell is two 32 bit words in parallel arrays, about 8 bytes per cell
+# instead of a tuple per cell:
+#   chars    the code point of the character, 0 for the second half of a wide
+#            character, CLUSTER + n for a character with combining marks
+#   styles   the index of its (fg, bk, attrs) style in the style table
+#
+# Style and cluster tables are shared by copies, so snapshots stay small and
+# comparing two buffers is comparing their arrays. They only grow: once they
+# hold more than compact_limit() entries, the owner moves its buffers to new
+# tables with rebased(), dropping the styles no buffer uses. Rows written
+# since the last clean() are marked in the dirty bitmap.
+
+import sys
+from array import array
+
+# (fg, bk, attrs) of style 0
+DEFAULT_STYLE = (None, None, 0)
+CONTINUATION = 0
+CLUSTER = 0x110000
+SPACE = 32
+# Entries the tables can hold beyond two per cell before they are compacted
+TABLE_SLACK = 4096
+# Text encoded with UTF32 is an array("I") of its code points
+UTF32 = "utf-32-le" if sys.byteorder == "little" else "utf-32-be"
+
+
+class Tables:
+    """Styles and combined characters used by a family of buffers."""
+
+    def __init__(self):
+        self.styles = [DEFAULT_STYLE]
+        self.style_ids = {DEFAULT_STYLE: 0}
+        self.clusters = []
+        self.cluster_ids = {}
+
+    def style_id(self, style):
+        sid = self.style_ids.get(style)
+        if sid is None:
+            sid = self.style_ids[style] = len(self.styles)
+            self.styles.append(style)
+        return sid
+
+    def code(self, ch):
+        if len(ch) == 1:
+            return ord(ch)
+        if not ch:
+            return CONTINUATION
+        cid = self.cluster_ids.get(ch)
+        if cid is None:
+            cid = self.cluster_ids[ch] = len(self.clusters)
+            self.clusters.append(ch)
+        return CLUSTER + cid
+
+    def char(self, code):
+        if code < CLUSTER:
+            return chr(code) if code else ""
+        return self.clusters[code - CLUSTER]
+
+    def __len__(self):
+        return len(self.styles) + len(self.clusters)
+
+
+class CellBuffer:
+    def __init__(self, columns, lines, style=DEFAULT_STYLE, tables=None):
+        self.ncolumns = columns
+        self.nlines = lines
+        self.tables = tables if tables is not None else Tables()
+        size = columns * lines
+        self.chars = array("I", [SPACE]) * size
+        self.styles = array("I", [self.tables.style_id(style)]) * size
+        self.dirty = bytearray(b"\x01") * lines
+
+    def copy(self):
+        """Returns a snapshot of the cells, sharing the tables."""
+        other = CellBuffer.__new__(CellBuffer)
+        other.ncolumns = self.ncolumns
+        other.nlines = self.nlines
+        other.tables = self.tables
+        other.chars = self.chars[:]
+        other.styles = self.styles[:]
+        other.dirty = bytearray(self.nlines)
+        return other
+
+    def rebased(self, tables):
+        """Returns a copy of the cells that uses tables, which gets the styles and clusters it needs."""
+        other = self.copy()
+        other.tables = tables
+        old = self.tables
+        sids = {sid: tables.style_id(old.styles[sid]) for sid in set(self.styles)}
+        other.styles = array("I", map(sids.__getitem__, self.styles))
+        codes = {code: tables.code(old.char(code)) for code in set(self.chars) if code >= CLUSTER}
+        if codes:
+            other.chars = array("I", [codes.get(code, code) for code in self.chars])
+        return other
+
+    def compact_limit(self):
+        """Size of the tables past which they should be compacted."""
+        return 2 * len(self.chars) + TABLE_SLACK
+
+    def nbytes(self):
+        """Memory used by the cells (the tables are shared)."""
+        return (len(self.chars) + len(self.styles)) * 4 + len(self.dirty)
+
+    def cell(self, x, y):
+        """Returns the (ch, fg, bk, attrs) tuple of a cell."""
+        i = y * self.ncolumns + x
+        return (self.tables.char(self.chars[i]),) + self.tables.styles[self.styles[i]]
+
+    def row(self, y):
+        start = y * self.ncolumns
+        char, styles = self.tables.char, self.tables.styles
+        return [
+            (char(code),) + styles[sid]
+            for code, sid in zip(self.chars[start : start + self.ncolumns], self.styles[start : start + self.ncolumns])
+        ]
+
+    def rows(self):
+        return [self.row(y) for y in range(self.nlines)]
+
+    def row_equal(self, y, other):
+        """True if line y has the same cells in both buffers, compared as array slices."""
+        start = y * self.ncolumns
+        end = start + self.ncolumns
+        return self.chars[start:end] == other.chars[start:end] and self.styles[start:end] == other.styles[start:end]
+
+    def fill(self, style=DEFAULT_STYLE, ch=" "):
+        size = self.ncolumns * self.nlines
+        self.chars = array("I", [self.tables.code(ch)]) * size
+        self.styles = array("I", [self.tables.style_id(style)]) * size
+        self.dirty = bytearray(b"\x01") * self.nlines
+
+    def clean(self):
+        self.dirty = bytearray(self.nlines)
+
+    def resized(self, columns, lines, style=DEFAULT_STYLE):
+        """Returns a columns x lines buffer with the cells of this one that fit."""
+        other = CellBuffer(columns, lines, style, self.tables)
+        width = min(columns, self.ncolumns)
+        for y in range(min(lines, self.nlines)):
+            start = y * self.ncolumns
+            other.chars[y * columns : y * columns + width] = self.chars[start : start + width]
+            other.styles[y * columns : y * columns + width] = self.styles[start : start + width]
+        return other
+
+    def as_numpy(self):
+        """Returns (chars, styles) as lines x columns NumPy views of the arrays (requires NumPy)."""
+        import numpy as np
+
+        shape = (self.nlines, self.ncolumns)
+        chars = np.frombuffer(self.chars, dtype=np.uint32).reshape(shape)
+        styles = np.frombuffer(self.styles, dtype=np.uint32).reshape(shape)
+        return chars, styles
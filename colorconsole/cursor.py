@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Cursor motion planner.
+#
+# Like curses' mvcur, picks the cheapest way of moving the cursor between two
+# known positions: absolute positioning, CR/LF, relative moves, backspaces or
+# rewriting the characters that are already on the screen.
+#
+# Positions are (column, line) tuples in terminal coordinates (1 based) and
+# must be on the screen: LF at the last line would scroll it. With a scroll
+# region, LF also scrolls at the bottom margin and CUU/CUD stop at the
+# margins, so the line is then only changed with absolute moves.
+
+from .ansi_codes import ESCAPE, CODES
+
+
+def _absolute(x, y):
+    if x == 1:
+        return ESCAPE + "H" if y == 1 else ESCAPE + "%dH" % y
+    return CODES["gotoxy"] % (y, x)
+
+
+def _relative(code, n):
+    return ESCAPE + CODES[code][-1] if n == 1 else CODES[code] % n
+
+
+def _horizontal(cx, tx, overwrite):
+    # From column cx to column tx on the same line
+    if tx == cx:
+        return ""
+    if tx > cx:
+        best = _relative("move_right", tx - cx)
+        if overwrite is not None and len(overwrite) <= len(best):
+            best = overwrite
+        return best
+    if tx == 1:
+        return "\r"
+    n = cx - tx
+    best = min("\b" * n, _relative("move_left", n), key=len)
+    return min(best, "\r" + _relative("move_right", tx - 1), key=len)
+
+
+def move_cursor(current, target, overwrite=None, region=None):
+    """Returns the shortest sequence that moves the cursor from current to target.
+
+    current is None when the cursor position is unknown. overwrite, when given,
+    is the text already displayed between the two positions on the same line,
+    in the current style, which can be written again to move right.
+    region is the (top, bottom) scroll region set on the terminal, if any.
+    """
+    tx, ty = target
+    best = _absolute(tx, ty)
+    if current is None:
+        return best
+    cx, cy = current
+    if cy == ty:
+        candidate = _horizontal(cx, tx, overwrite)
+    elif region is not None:
+        return best
+    elif ty > cy:
+        dy = ty - cy
+        if tx == 1:
+            candidate = "\r" + min("\n" * dy, _relative("move_down", dy), key=len)
+        else:
+            candidate = _relative("move_down", dy) + _horizontal(cx, tx, None)
+    else:
+        candidate = _relative("move_up", cy - ty) + _horizontal(cx, tx, None)
+    return candidate if len(candidate) < len(best) else best
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# RGB image rendering with NumPy (optional dependency).
+#
+# Each cell shows two pixels with the upper half block character: the
+# foreground is the top pixel and the background the bottom one. Every cell
+# is laid out as a fixed size record of bytes, and a mask selects the bytes
+# that are really sent: color sequences are dropped when the color did not
+# change since the previous cell, as are the leading zeros of each number.
+# 256 and 16 color terminals get the nearest palette colors (quantize.py).
+
+import numpy as np
+
+from .ansi_codes import CODES
+from .quantize import quantize
+from .sgr import COLOR_256, sgr_transition
+
+UPPER_HALF_BLOCK = "▀"
+
+# Record layout: ESC[38;2;RRR;GGG;BBBm ESC[48;2;RRR;GGG;BBBm <half block>
+_FG = b"\x1b[38;2;000;000;000m"
+_BK = b"\x1b[48;2;000;000;000m"
+_CHAR = UPPER_HALF_BLOCK.encode("utf-8")
+_TEMPLATE = np.frombuffer(_FG + _BK + _CHAR, dtype=np.uint8)
+_RECORD = len(_TEMPLATE)
+_FG_DIGITS = (7, 11, 15)
+_BK_DIGITS = tuple(len(_FG) + d for d in _FG_DIGITS)
+_BK_START = len(_FG)
+_CHAR_START = len(_FG) + len(_BK)
+
+# Three ASCII digits of every byte value and which of them are significant
+_values = np.arange(256)
+DIGITS = np.stack([48 + _values // 100, 48 + _values // 10 % 10, 48 + _values % 10], axis=1).astype(np.uint8)
+SIGNIFICANT = np.stack([_values >= 100, _values >= 10, np.ones(256, dtype=bool)], axis=1)
+
+
+def pack_rgb(pixels):
+    pixels = pixels.astype(np.uint32)
+    return (pixels[..., 0] << 16) | (pixels[..., 1] << 8) | pixels[..., 2]
+
+
+def crop(image, x, y, columns, lines):
+    """Returns (image, x, y) with only the pixels of image drawn at column x, line y on a columns x lines screen.
+
+    Cells out of the screen would wrap lines and scroll the terminal.
+    """
+    image = np.asarray(image, dtype=np.uint8)
+    if image.ndim != 3:
+        return image, x, y
+    x, y = int(x), int(y)
+    left = max(1 - x, 0)
+    top = 2 * max(1 - y, 0)
+    x, y = x + left, y + top // 2
+    return image[top : top + 2 * max(lines - y + 1, 0), left : left + max(columns - x + 1, 0)], x, y
+
+
+def render_half_blocks(image, x, y, fg=None, bk=None):
+    """Returns (text, fg, bk) that draws image with its top left corner at terminal column x, line y.
+
+    image is a HxWx3 uint8 array. fg and bk are the 0xRRGGBB colors the terminal
+    is known to use, or None. The returned fg and bk are the ones left selected.
+    An odd last pixel line is drawn over black.
+    """
+    image = np.asarray(image, dtype=np.uint8)
+    if image.ndim != 3 or image.shape[2] != 3:
+        raise ValueError("image must be a HxWx3 array")
+    height, width = image.shape[:2]
+    if height % 2:
+        image = np.concatenate([image, np.zeros((1, width, 3), dtype=np.uint8)])
+    if width == 0 or height == 0:
+        return "", fg, bk
+    top = image[0::2].reshape(-1, 3)
+    bottom = image[1::2].reshape(-1, 3)
+    rows = len(top) // width
+
+    top_rgb = pack_rgb(top)
+    bottom_rgb = pack_rgb(bottom)
+    fg_changed = np.empty(len(top_rgb), dtype=bool)
+    bk_changed = np.empty(len(bottom_rgb), dtype=bool)
+    fg_changed[0] = fg is None or int(top_rgb[0]) != fg
+    bk_changed[0] = bk is None or int(bottom_rgb[0]) != bk
+    np.not_equal(top_rgb[1:], top_rgb[:-1], out=fg_changed[1:])
+    np.not_equal(bottom_rgb[1:], bottom_rgb[:-1], out=bk_changed[1:])
+
+    records = np.empty((len(top), _RECORD), dtype=np.uint8)
+    records[:] = _TEMPLATE
+    keep = np.zeros((len(top), _RECORD), dtype=bool)
+    keep[:, :_BK_START] = fg_changed[:, None]
+    keep[:, _BK_START:_CHAR_START] = bk_changed[:, None]
+    keep[:, _CHAR_START:] = True
+    for channel in range(3):
+        planes = ((top, fg_changed, _FG_DIGITS[channel]), (bottom, bk_changed, _BK_DIGITS[channel]))
+        for pixels, changed, start in planes:
+            values = pixels[:, channel]
+            records[:, start : start + 3] = DIGITS[values]
+            keep[:, start : start + 3] = SIGNIFICANT[values] & changed[:, None]
+
+    records = records.reshape(rows, -1)
+    keep = keep.reshape(rows, -1)
+    x = max(int(x), 1)
+    y = max(int(y), 1)
+    out = []
+    for row in range(rows):
+        out.append(CODES["gotoxy"] % (y + row, x))
+        out.append(records[row][keep[row]].tobytes().decode("utf-8"))
+    return "".join(out), int(top_rgb[-1]), int(bottom_rgb[-1])
+
+
+def render_half_blocks_palette(image, x, y, depth, state=None):
+    """Returns (text, state) that draws image as render_half_blocks does, with 256 (depth 8) or 16 (depth 4) colors.
+
+    state is the (fg, bk, attrs) style the terminal is in, None if unknown; the returned one is left selected.
+    Attributes are kept.
+    """
+    image = np.asarray(image, dtype=np.uint8)
+    if image.ndim != 3 or image.shape[2] != 3:
+        raise ValueError("image must be a HxWx3 array")
+    height, width = image.shape[:2]
+    if width == 0 or height == 0:
+        return "", state
+    if height % 2:
+        image = np.concatenate([image, np.zeros((1, width, 3), dtype=np.uint8)])
+    colors = quantize(image, 256 if depth >= 8 else 16).astype(np.intp)
+    if depth >= 8:
+        colors |= COLOR_256
+    attrs = state[2] if state is not None else 0
+    x = max(int(x), 1)
+    y = max(int(y), 1)
+    out = []
+    write = out.append
+    for row, (top, bottom) in enumerate(zip(colors[0::2].tolist(), colors[1::2].tolist())):
+        write(CODES["gotoxy"] % (y + row, x))
+        for fg, bk in zip(top, bottom):
+            new = (fg, bk, attrs)
+            if new != state:
+                write(sgr_transition(state, new))
+                state = new
+            write(UPPER_HALF_BLOCK)
+    return "".join(out), state
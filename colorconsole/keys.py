@@ -0,0 +1,463 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Keyboard input decoding.
+#
+# KeyDecoder turns the bytes read from a terminal into Key events, keeping
+# incomplete escape sequences between reads. Fixed sequences are matched
+# with a trie compiled at import time and CSI sequences with parameters
+# (modifiers) are parsed by a small state machine.
+#
+# KeyReader feeds it from the asyncio event loop, so a program can wait for
+# keys and timers together. KeyInput is the synchronous equivalent.
+
+import asyncio
+import codecs
+import os
+import time
+from collections import deque, namedtuple
+from select import select
+
+# name is the key ("a", "UP", "F5", "ENTER", "PASTE"...), modifiers a mix of
+# SHIFT, ALT and CTRL, and data the characters received (the text for PASTE).
+Key = namedtuple("Key", ["name", "modifiers", "data"])
+
+SHIFT = 1
+ALT = 2
+CTRL = 4
+
+ESC = "\x1b"
+PASTE_START = "\x1b[200~"
+PASTE_END = "\x1b[201~"
+
+# Final character of CSI (ESC [) and SS3 (ESC O) sequences
+FINAL_KEYS = {
+    "A": "UP",
+    "B": "DOWN",
+    "C": "RIGHT",
+    "D": "LEFT",
+    "E": "BEGIN",
+    "F": "END",
+    "H": "HOME",
+    "P": "F1",
+    "Q": "F2",
+    "R": "F3",
+    "S": "F4",
+    "Z": "TAB",  # Shift+Tab
+    "M": "ENTER",  # keypad Enter (SS3)
+}
+
+# Number of ESC [ n ~ sequences
+TILDE_KEYS = {
+    1: "HOME",
+    2: "INSERT",
+    3: "DELETE",
+    4: "END",
+    5: "PAGE_UP",
+    6: "PAGE_DOWN",
+    7: "HOME",
+    8: "END",
+    11: "F1",
+    12: "F2",
+    13: "F3",
+    14: "F4",
+    15: "F5",
+    17: "F6",
+    18: "F7",
+    19: "F8",
+    20: "F9",
+    21: "F10",
+    23: "F11",
+    24: "F12",
+}
+
+CONTROL_KEYS = {
+    "\r": Key("ENTER", 0, "\r"),
+    "\n": Key("ENTER", 0, "\n"),
+    "\t": Key("TAB", 0, "\t"),
+    "\x7f": Key("BACKSPACE", 0, "\x7f"),
+    "\x08": Key("BACKSPACE", 0, "\x08"),
+    "\x00": Key(" ", CTRL, "\x00"),
+}
+for _n in range(1, 27):
+    CONTROL_KEYS.setdefault(chr(_n), Key(chr(_n + 96), CTRL, chr(_n)))
+for _c in "\x1c\x1d\x1e\x1f":
+    CONTROL_KEYS[_c] = Key(chr(ord(_c) + 64), CTRL, _c)
+
+
+# Sequences without parameters, matched by the trie
+FIXED_SEQUENCES = {ESC + "O" + final: (name, 0) for final, name in FINAL_KEYS.items()}
+FIXED_SEQUENCES.update(
+    {
+        # Linux console
+        "\x1b[[A": ("F1", 0),
+        "\x1b[[B": ("F2", 0),
+        "\x1b[[C": ("F3", 0),
+        "\x1b[[D": ("F4", 0),
+        "\x1b[[E": ("F5", 0),
+        # rxvt
+        "\x1b[a": ("UP", SHIFT),
+        "\x1b[b": ("DOWN", SHIFT),
+        "\x1b[c": ("RIGHT", SHIFT),
+        "\x1b[d": ("LEFT", SHIFT),
+        "\x1bOa": ("UP", CTRL),
+        "\x1bOb": ("DOWN", CTRL),
+        "\x1bOc": ("RIGHT", CTRL),
+        "\x1bOd": ("LEFT", CTRL),
+    }
+)
+
+
+def compile_trie(sequences):
+    """Builds a trie of nested dicts. A complete sequence stores its Key under the None entry."""
+    root = {}
+    for data, (name, modifiers) in sequences.items():
+        node = root
+        for ch in data:
+            node = node.setdefault(ch, {})
+        node[None] = Key(name, modifiers, data)
+    return root
+
+
+TRIE = compile_trie(FIXED_SEQUENCES)
+
+
+def _match(trie, buffer, i, n):
+    # Returns (key, end), (None, -1) when the buffer ends inside a sequence or (None, i) for no match
+    node = trie
+    j = i
+    while j < n:
+        child = node.get(buffer[j])
+        if child is None:
+            break
+        node = child
+        j += 1
+    key = node.get(None)
+    if key is not None:
+        return key, j
+    if j == n and len(node) > 0 and node is not trie:
+        return None, -1
+    return None, i
+
+
+def _csi_key(params, final, data):
+    numbers = [int(p) if p.isdigit() else 0 for p in params.split(";")] if params else []
+    modifiers = numbers[1] - 1 if len(numbers) > 1 and numbers[1] > 0 else 0
+    if final == "~":
+        name = TILDE_KEYS.get(numbers[0] if numbers else 0)
+    else:
+        name = FINAL_KEYS.get(final)
+        if final == "Z":
+            modifiers |= SHIFT
+    if name is None:
+        return Key("UNKNOWN", 0, data)
+    return Key(name, modifiers & (SHIFT | ALT | CTRL), data)
+
+
+class KeyDecoder:
+    """Incremental decoder of terminal input: feed() bytes or str, get Key events back."""
+
+    def __init__(self, encoding="utf-8"):
+        self.text_decoder = codecs.getincrementaldecoder(encoding)("replace")
+        # Decoded input not made into keys yet: at most an incomplete escape sequence
+        self.buffer = ""
+        # Chunks of the bracketed paste being received, None outside pastes
+        self.paste = None
+
+    @property
+    def pending(self):
+        """True when the input ends with an incomplete escape sequence (see flush)."""
+        return bool(self.buffer) and self.paste is None
+
+    def feed(self, data):
+        if isinstance(data, bytes):
+            data = self.text_decoder.decode(data)
+        self.buffer += data
+        keys = []
+        self._decode(keys)
+        return keys
+
+    def flush(self):
+        """Decodes what is left as if no more input will come: a lone ESC is the Escape key."""
+        keys = []
+        if self.paste is not None:
+            keys.append(Key("PASTE", 0, "".join(self.paste) + self.buffer))
+            self.paste = None
+            self.buffer = ""
+        self._decode(keys, final=True)
+        return keys
+
+    def _decode(self, keys, final=False):
+        buffer = self.buffer
+        i = 0
+        n = len(buffer)
+        append = keys.append
+        while i < n:
+            if self.paste is not None:
+                end = buffer.find(PASTE_END, i)
+                if end < 0:
+                    # Keeps a possible partial end marker in the buffer
+                    keep = max(i, n - len(PASTE_END) + 1)
+                    self.paste.append(buffer[i:keep])
+                    i = keep
+                    break
+                append(Key("PASTE", 0, "".join(self.paste) + buffer[i:end]))
+                self.paste = None
+                i = end + len(PASTE_END)
+                continue
+            ch = buffer[i]
+            if ch != ESC:
+                key = CONTROL_KEYS.get(ch)
+                append(key if key is not None else Key(ch, 0, ch))
+                i += 1
+                continue
+            # Escape sequences
+            if i + 1 >= n:
+                if not final:
+                    break
+                append(Key("ESCAPE", 0, ESC))
+                i += 1
+                continue
+            key, end = _match(TRIE, buffer, i, n)
+            if key is not None:
+                append(key)
+                i = end
+                continue
+            if end < 0 and not final:
+                break
+            ch = buffer[i + 1]
+            if ch == "[":
+                j = i + 2
+                while j < n and "\x20" <= buffer[j] <= "\x3f":
+                    j += 1
+                if j >= n:
+                    if not final:
+                        break
+                    append(Key("[", ALT, buffer[i : i + 2]))
+                    i += 2
+                    continue
+                data = buffer[i : j + 1]
+                if data == PASTE_START:
+                    self.paste = []
+                else:
+                    append(_csi_key(buffer[i + 2 : j], buffer[j], data))
+                i = j + 1
+            elif ch == "O":
+                if i + 2 >= n:
+                    if not final:
+                        break
+                    append(Key("O", ALT, buffer[i : i + 2]))
+                    i += 2
+                    continue
+                data = buffer[i : i + 3]
+                name = FINAL_KEYS.get(buffer[i + 2])
+                append(Key(name, 0, data) if name else Key("UNKNOWN", 0, data))
+                i += 3
+            elif ch == ESC:
+                append(Key("ESCAPE", 0, ESC))
+                i += 1
+            else:
+                # Alt+key
+                key = CONTROL_KEYS.get(ch)
+                if key is None:
+                    append(Key(ch, ALT, buffer[i : i + 2]))
+                else:
+                    append(Key(key.name, key.modifiers | ALT, buffer[i : i + 2]))
+                i += 2
+        self.buffer = buffer[i:]
+
+
+class KeyReader:
+    """Asynchronous iterator of Key events read from fd with the running event loop.
+
+    Bytes are read when the loop reports fd as readable, so waiting costs no CPU.
+    An incomplete escape sequence still pending after escape_timeout seconds is
+    decoded as typed (a lone ESC becomes the Escape key).
+    """
+
+    def __init__(self, fd, escape_timeout=0.05, decoder=None):
+        self.fd = fd
+        self.escape_timeout = escape_timeout
+        self.decoder = decoder if decoder is not None else KeyDecoder()
+        self.keys = deque()
+        self.loop = None
+        self.waiter = None
+        self.timer = None
+        self.error = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.keys:
+            if self.error is not None:
+                raise self.error
+            if self.loop is None:
+                self.start()
+            self.waiter = self.loop.create_future()
+            try:
+                await self.waiter
+            finally:
+                self.waiter = None
+        return self.keys.popleft()
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.loop.add_reader(self.fd, self._readable)
+
+    def close(self):
+        if self.loop is not None:
+            self.loop.remove_reader(self.fd)
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            self.loop = None
+
+    async def aclose(self):
+        self.close()
+
+    def _wake(self):
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    def _readable(self):
+        try:
+            data = os.read(self.fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self.error = e
+            data = b""
+        if not data:
+            if self.error is None:
+                self.error = StopAsyncIteration()
+            self.close()
+            if self.waiter is not None and not self.waiter.done():
+                self.waiter.set_exception(self.error)
+            return
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        self.keys.extend(self.decoder.feed(data))
+        if self.decoder.pending:
+            self.timer = self.loop.call_later(self.escape_timeout, self._timeout)
+        if self.keys:
+            self._wake()
+
+    def _timeout(self):
+        self.timer = None
+        self.keys.extend(self.decoder.flush())
+        if self.keys:
+            self._wake()
+
+
+class KeyInput:
+    """Synchronous key input from fd.
+
+    Each wakeup reads up to 4096 bytes with a single os.read and decodes them
+    into a queue of keys. An escape sequence split between reads is completed
+    by waiting up to escape_timeout seconds for the rest.
+    """
+
+    def __init__(self, fd, escape_timeout=0.05, decoder=None):
+        self.fd = fd
+        self.escape_timeout = escape_timeout
+        self.decoder = decoder if decoder is not None else KeyDecoder()
+        self.keys = deque()
+        # Characters of the first key already returned by getch
+        self.consumed = 0
+        # Set when a read found the end of file, until getch or read_key reports it
+        self.eof = False
+
+    def _wait(self, timeout):
+        dr, dw, de = select([self.fd], [], [], timeout)
+        return dr != []
+
+    def _fill(self, timeout):
+        # Reads once (waiting up to timeout seconds, None for ever), returns False if nothing arrived
+        if not self._wait(timeout):
+            return False
+        data = os.read(self.fd, 4096)
+        if not data:
+            self.keys.extend(self.decoder.flush())
+            self.eof = True
+            return True
+        keys = self.keys
+        keys.extend(self.decoder.feed(data))
+        deadline = None
+        while self.decoder.pending:
+            if deadline is None:
+                deadline = time.monotonic() + self.escape_timeout
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._wait(remaining):
+                keys.extend(self.decoder.flush())
+                break
+            data = os.read(self.fd, 4096)
+            if not data:
+                keys.extend(self.decoder.flush())
+                break
+            keys.extend(self.decoder.feed(data))
+        return True
+
+    def kbhit(self, timeout=0):
+        # True at the end of file too, getch then returns ""
+        while not self.keys and not self.eof:
+            start = time.monotonic()
+            if not self._fill(timeout):
+                return False
+            if timeout is not None:
+                timeout = max(0, timeout - (time.monotonic() - start))
+        return True
+
+    def read_key(self, timeout=None):
+        """Returns the next Key, or None if none arrives within timeout seconds.
+
+        Raises EOFError at the end of the input.
+        """
+        if not self.kbhit(timeout):
+            return None
+        if not self.keys:
+            self.eof = False
+            raise EOFError()
+        key = self.keys.popleft()
+        if self.consumed:
+            key = key._replace(data=key.data[self.consumed :])
+            self.consumed = 0
+        return key
+
+    def getch(self):
+        """Returns the next character typed, like reading one character from stdin."""
+        while True:
+            self.kbhit(None)
+            if not self.keys:
+                # End of file: "" as sys.stdin.read(1)
+                self.eof = False
+                return ""
+            key = self.keys[0]
+            if self.consumed < len(key.data):
+                break
+            # An empty paste
+            self.keys.popleft()
+            self.consumed = 0
+        ch = key.data[self.consumed]
+        self.consumed += 1
+        if self.consumed >= len(key.data):
+            self.keys.popleft()
+            self.consumed = 0
+        return ch
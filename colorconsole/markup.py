@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Style markup:
+#
+#   "[bold red on black]ERR[/] {msg}"
+#
+# A tag holds attribute names (bold, dim, italic, underline, blink, reverse,
+# invisible, crossed), a foreground color and "on" followed by a background
+# color. Colors are the names of terminal.colors in any case, "default",
+# color(n) for the xterm 256 colors or #rrggbb. [/] goes back to the style
+# before the last tag and [[ is a literal [. Text can have str.format fields.
+# A tag that is not a style ("[INFO]", "[{}]"...) is kept as text.
+#
+# Templates are compiled once into a tuple of ready made strings (text and
+# escape sequences) and fields, so rendering only formats fields and joins.
+
+import re
+from functools import lru_cache
+from string import Formatter
+
+from .sgr import (
+    sgr_transition,
+    degrade,
+    color_256,
+    color_24bit,
+    BOLD,
+    DIM,
+    ITALIC,
+    UNDERLINE,
+    BLINK,
+    REVERSE,
+    INVISIBLE,
+    CROSSED,
+)
+from .terminal import colors
+
+ATTRIBUTES = {
+    "bold": BOLD,
+    "dim": DIM,
+    "italic": ITALIC,
+    "underline": UNDERLINE,
+    "blink": BLINK,
+    "reverse": REVERSE,
+    "invisible": INVISIBLE,
+    "crossed": CROSSED,
+}
+
+COLOR_NAMES = {name.lower(): number for name, number in colors.items()}
+COLOR_NAMES["default"] = None
+
+CACHE_SIZE = 512
+
+_TAG = re.compile(r"\[\[|\[(/?)([^\[\]]*)\]")
+_formatter = Formatter()
+
+
+def _color(word):
+    if word in COLOR_NAMES:
+        return COLOR_NAMES[word]
+    if word.startswith("color(") and word.endswith(")") and word[6:-1].isdigit():
+        return color_256(int(word[6:-1]))
+    if len(word) == 7 and word[0] == "#":
+        try:
+            rgb = int(word[1:], 16)
+        except ValueError:
+            pass
+        else:
+            return color_24bit(rgb >> 16, (rgb >> 8) & 0xFF, rgb & 0xFF)
+    raise ValueError("Unknown color in markup: %r" % word)
+
+
+def parse_style(tag, style):
+    """Returns the (fg, bk, attrs) style of tag applied over style."""
+    fg, bk, attrs = style
+    words = tag.lower().split()
+    i = 0
+    while i < len(words):
+        word = words[i]
+        if word in ATTRIBUTES:
+            attrs |= ATTRIBUTES[word]
+        elif word.startswith("not") and word[3:] in ATTRIBUTES:
+            attrs &= ~ATTRIBUTES[word[3:]]
+        elif word == "on":
+            i += 1
+            if i == len(words):
+                raise ValueError("Missing background color in markup: %r" % tag)
+            bk = _color(words[i])
+        else:
+            fg = _color(word)
+        i += 1
+    return fg, bk, attrs
+
+
+def _fields(text, out):
+    # Splits a str.format string into literal strings and (field, conversion, spec) tuples
+    for literal, field, spec, conversion in _formatter.parse(text):
+        if literal:
+            out.append(literal)
+        if field is not None:
+            out.append((field, conversion, spec))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_markup(template, base=(None, None, 0), color_depth=24):
+    """Compiles template for a terminal whose current style is base.
+
+    Returns a tuple of strings and (field, conversion, spec) tuples. The escape
+    sequences end by restoring base.
+    """
+    out = []
+    stack = [base]
+    sent = base
+    position = 0
+    for match in _TAG.finditer(template):
+        _fields(template[position : match.start()], out)
+        position = match.end()
+        if match.group(0) == "[[":
+            out.append("[")
+            continue
+        if match.group(1):
+            if len(stack) > 1:
+                stack.pop()
+        else:
+            try:
+                style = parse_style(match.group(2), stack[-1]) if match.group(2).strip() else None
+            except ValueError:
+                style = None
+            if style is None:
+                _fields(match.group(0), out)
+                continue
+            stack.append(style)
+        style = stack[-1]
+        if color_depth and style != sent:
+            if color_depth < 24:
+                wanted = (degrade(style[0], color_depth), degrade(style[1], color_depth), style[2])
+            else:
+                wanted = style
+            out.append(sgr_transition(sent, wanted))
+            sent = wanted
+    _fields(template[position:], out)
+    if sent != base:
+        out.append(sgr_transition(sent, base))
+
+    # Joins consecutive strings
+    segments = []
+    for item in out:
+        if isinstance(item, str) and segments and isinstance(segments[-1], str):
+            segments[-1] += item
+        elif item != "":
+            segments.append(item)
+    return tuple(segments)
+
+
+def expand(segments, args=(), kwargs=None):
+    """Joins compiled segments, formatting fields with args and kwargs."""
+    if len(segments) == 1 and isinstance(segments[0], str):
+        return segments[0]
+    kwargs = {} if kwargs is None else kwargs
+    parts = []
+    auto = 0
+    for item in segments:
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+        field, conversion, spec = item
+        if field == "":
+            field = str(auto)
+            auto += 1
+        value = _formatter.get_field(field, args, kwargs)[0]
+        if conversion:
+            value = _formatter.convert_field(value, conversion)
+        parts.append(format(value, spec) if spec else str(value))
+    return "".join(parts)
+
+
+def render(template, *args, **kwargs):
+    """Returns template rendered for a 24 bit color terminal in the default style."""
+    return expand(compile_markup(template), args, kwargs)
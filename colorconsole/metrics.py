@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Opt-in output metrics:
+#
+#   metrics = term.enable_metrics()
+#   ...
+#   term.stats()                    # snapshot, stats(reset=True) starts again
+#   metrics.dump_every(10, "/tmp/term.jsonl")
+#
+# While metrics are disabled, terminals only test self.metrics is None.
+# Escape sequences are counted by type, named after the CODES keys (gotoxy,
+# move_up, clear...) or the color setters (sgr, xterm256, xterm24bit).
+
+import json
+import re
+import threading
+import time
+from collections import Counter
+
+# Upper bounds of the flush latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, float("inf"))
+
+SEQUENCE_CACHE_SIZE = 4096
+
+_SEQUENCE = re.compile(r"\x1b(?:\[([0-?]*)[ -/]*([@-~])|(\]))")
+
+CSI_NAMES = {
+    "H": "gotoxy",
+    "f": "gotoxy",
+    "A": "move_up",
+    "B": "move_down",
+    "C": "move_right",
+    "D": "move_left",
+    "K": "clear_eol",
+    "s": "save",
+    "u": "restore",
+    "r": "scroll_region",
+    "L": "insert_line",
+    "M": "delete_line",
+    "S": "scroll_up",
+    "T": "scroll_down",
+    "X": "erase_chars",
+    "b": "repeat",
+    "h": "mode",
+    "l": "mode",
+}
+
+
+# Erase in display (ED) by parameter: ESC[J clears to the end of the screen
+ED_NAMES = {"": "clear_eos", "0": "clear_eos", "2": "clear", "3": "clear"}
+
+
+def _sequence_name(params, final):
+    if final == "J":
+        return ED_NAMES.get(params, "csi_J")
+    if final == "m":
+        if "38;2" in params or "48;2" in params:
+            return "xterm24bit"
+        if "38;5" in params or "48;5" in params:
+            return "xterm256"
+        return "sgr"
+    return CSI_NAMES.get(final, "csi_" + final)
+
+
+def sequence_names(text):
+    """Returns the type names of the escape sequences in text."""
+    names = []
+    for params, final, osc in _SEQUENCE.findall(text):
+        names.append("title" if osc else _sequence_name(params, final))
+    return names
+
+
+class Metrics:
+    def __init__(self):
+        self._cache = {}
+        self._dump = None
+        self.reset()
+
+    def reset(self):
+        self.started = time.monotonic()
+        self.writes = 0
+        self.bytes = 0
+        self.syscalls = 0
+        self.flushes = 0
+        self.sequences = Counter()
+        self.latency = [0] * len(LATENCY_BUCKETS)
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def write(self, text):
+        # A Terminal.write call: counts its escape sequences
+        self.writes += 1
+        if "\x1b" not in text:
+            return
+        names = self._cache.get(text)
+        if names is None:
+            if len(self._cache) >= SEQUENCE_CACHE_SIZE:
+                self._cache.clear()
+            names = self._cache[text] = sequence_names(text)
+        self.sequences.update(names)
+
+    def syscall(self, size):
+        self.syscalls += 1
+        self.bytes += size
+
+    def flush(self, seconds):
+        self.flushes += 1
+        self.latency_total += seconds
+        if seconds > self.latency_max:
+            self.latency_max = seconds
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.latency[i] += 1
+                break
+
+    def stats(self, reset=False):
+        """Returns a snapshot of the counters as a dict (JSON compatible)."""
+        elapsed = time.monotonic() - self.started
+        buckets = {("%g" % bound): n for bound, n in zip(LATENCY_BUCKETS, self.latency)}
+        snapshot = {
+            "elapsed": elapsed,
+            "writes": self.writes,
+            "bytes": self.bytes,
+            "bytes_per_s": self.bytes / elapsed if elapsed else 0.0,
+            "syscalls": self.syscalls,
+            "flushes": self.flushes,
+            "sequences": dict(self.sequences),
+            "flush_latency": {
+                "buckets": buckets,
+                "mean": self.latency_total / self.flushes if self.flushes else 0.0,
+                "max": self.latency_max,
+            },
+        }
+        if reset:
+            self.reset()
+        return snapshot
+
+    def dump_every(self, interval, target, reset=True):
+        """Sends stats() every interval seconds to target: a callable or a file name (one JSON object per line)."""
+        self.stop_dump()
+        stop = threading.Event()
+
+        def dump():
+            while not stop.wait(interval):
+                snapshot = self.stats(reset)
+                if callable(target):
+                    target(snapshot)
+                else:
+                    with open(target, "a") as output:
+                        output.write(json.dumps(snapshot) + "\n")
+
+        thread = threading.Thread(target=dump, name="colorconsole-metrics", daemon=True)
+        self._dump = (stop, thread)
+        thread.start()
+
+    def stop_dump(self):
+        if self._dump is not None:
+            stop, thread = self._dump
+            stop.set()
+            thread.join()
+            self._dump = None
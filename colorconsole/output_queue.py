@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Single writer output for multi-threaded programs:
+#
+#   out = OutputQueue(term)
+#   out.start()
+#   ...
+#   out.print_at(10, 2, "50%", fg=colors["YELLOW"])   # from any thread
+#   ...
+#   out.stop()
+#
+# Threads append draw commands (position, style and text) to a deque, which
+# needs no lock. A writer thread is the only one using the terminal: it takes
+# everything queued, drops commands completely covered by a later one at the
+# same position and writes the batch as a single frame.
+
+import threading
+from collections import deque
+
+from .width import text_width
+
+
+class OutputQueue:
+    def __init__(self, terminal, maxsize=10000):
+        self.terminal = terminal
+        # Commands submitted while maxsize are waiting are dropped
+        self.maxsize = maxsize
+        self._queue = deque()
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._busy = False
+        self._stopping = False
+        self._thread = None
+        self._drop_lock = threading.Lock()
+        self.submitted = 0
+        self.written = 0
+        self.merged = 0
+        self.dropped = 0
+        self.batches = 0
+        self.max_depth = 0
+
+    def start(self):
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="colorconsole-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Writes what is still queued and stops the writer thread."""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def print_at(self, x, y, text, fg=None, bk=None, attrs=0):
+        """Queues text at x, y (1 based) with colors fg, bk and sgr attribute bits. False when dropped."""
+        if len(self._queue) >= self.maxsize:
+            with self._drop_lock:
+                self.dropped += 1
+            return False
+        self._queue.append((x, y, str(text), fg, bk, attrs))
+        self._idle.clear()
+        self._wake.set()
+        return True
+
+    def depth(self):
+        """Number of commands waiting for the writer."""
+        return len(self._queue)
+
+    def join(self, timeout=None):
+        """Waits until everything queued was written. Returns False on timeout."""
+        waited = 0.0
+        while self._queue or self._busy:
+            if timeout is not None and waited >= timeout:
+                return False
+            self._idle.wait(0.01)
+            waited += 0.01
+        return True
+
+    def stats(self):
+        return {
+            "depth": len(self._queue),
+            "max_depth": self.max_depth,
+            "submitted": self.submitted,
+            "written": self.written,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "batches": self.batches,
+        }
+
+    def _drain(self):
+        # Takes the queued commands. A command hides an earlier one at the same
+        # position when it is at least as wide, so the earlier one is dropped.
+        queue = self._queue
+        self.max_depth = max(self.max_depth, len(queue))
+        batch = []
+        # Index in batch of the last command at each position
+        positions = {}
+        while True:
+            try:
+                command = queue.popleft()
+            except IndexError:
+                break
+            key = command[:2]
+            previous = positions.get(key)
+            if previous is not None and text_width(command[2]) >= text_width(batch[previous][2]):
+                batch[previous] = None
+                self.merged += 1
+            positions[key] = len(batch)
+            batch.append(command)
+        self.submitted += len(batch)
+        return [command for command in batch if command is not None]
+
+    def _write(self, batch):
+        term = self.terminal
+        with term.frame():
+            for x, y, text, fg, bk, attrs in batch:
+                term.gotoXY(x, y)
+                term.set_style(fg, bk, attrs)
+                term.print(text)
+        self.written += len(batch)
+        self.batches += 1
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            self._busy = True
+            try:
+                batch = self._drain()
+                if batch:
+                    self._write(batch)
+            finally:
+                self._busy = False
+            if not self._queue:
+                self._idle.set()
+                if self._stopping:
+                    return
+            else:
+                self._wake.set()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Scrolling log pane between fixed lines of the screen:
+#
+#   log = LogPane(term, top=3, bottom=20)
+#   log.append("connected", fg=colors["GREEN"])
+#
+# The pane sets the terminal scroll region (DECSTBM) to its lines, so a new
+# line at the bottom makes the terminal scroll the pane by itself, and
+# insert/delete line (IL/DL) open or close a line in the middle. Each call
+# writes the changed line only, whatever the pane height. The scroll region
+# is reset after every call, so other output is not affected.
+
+from contextlib import contextmanager
+
+from .width import clip
+
+
+class LogPane:
+    def __init__(self, terminal, top, bottom):
+        self.terminal = terminal
+        # First and last line of the pane, 1 based
+        self.top = top
+        self.bottom = bottom
+        # (text, fg, bk) of each visible line
+        self.lines = []
+
+    @property
+    def height(self):
+        return self.bottom - self.top + 1
+
+    def _draw(self, index, text, fg, bk, erase):
+        term = self.terminal
+        term.gotoXY(1, self.top + index)
+        term.set_style(fg, bk)
+        text, width = clip(str(text), term.columns())
+        term.print(text)
+        if erase and width < term.columns():
+            term.reset_colors()
+            term.clear_eol()
+
+    @contextmanager
+    def _frame(self):
+        # Lines are drawn in their own colors; the caller's style is selected again at the end
+        term = self.terminal
+        saved = (term.fg, term.bk, term.attrs)
+        with term.frame():
+            yield term
+            term.set_style(*saved)
+
+    def append(self, text, fg=None, bk=None):
+        """Adds a line at the bottom, scrolling the pane when it is full."""
+        with self._frame() as term:
+            if len(self.lines) < self.height:
+                self.lines.append((text, fg, bk))
+                self._draw(len(self.lines) - 1, text, fg, bk, True)
+                return
+            del self.lines[0]
+            self.lines.append((text, fg, bk))
+            # The line scrolled in takes the current background
+            term.reset_colors()
+            term.set_scroll_region(self.top, self.bottom)
+            # A line feed on the bottom line scrolls the region
+            term.gotoXY(1, self.bottom)
+            term.write("\n")
+            self._draw(self.height - 1, text, fg, bk, False)
+            term.reset_scroll_region()
+
+    def insert(self, index, text, fg=None, bk=None):
+        """Inserts a line before line index (0 is the first line of the pane). The last line may drop out."""
+        index = min(index, len(self.lines))
+        self.lines.insert(index, (text, fg, bk))
+        if len(self.lines) > self.height:
+            del self.lines[-1]
+        with self._frame() as term:
+            term.reset_colors()
+            term.set_scroll_region(self.top, self.bottom)
+            term.gotoXY(1, self.top + index)
+            term.insert_lines()
+            self._draw(index, text, fg, bk, False)
+            term.reset_scroll_region()
+
+    def delete(self, index):
+        """Removes line index, moving the lines below it up."""
+        if index >= len(self.lines):
+            return
+        del self.lines[index]
+        with self._frame() as term:
+            term.reset_colors()
+            term.set_scroll_region(self.top, self.bottom)
+            term.gotoXY(1, self.top + index)
+            term.delete_lines()
+            term.reset_scroll_region()
+
+    def replace(self, index, text, fg=None, bk=None):
+        """Changes line index in place."""
+        if index >= len(self.lines):
+            return
+        self.lines[index] = (text, fg, bk)
+        with self._frame():
+            self._draw(index, text, fg, bk, True)
+
+    def clear(self):
+        self.lines = []
+        self.redraw()
+
+    def redraw(self):
+        """Repaints the whole pane."""
+        with self._frame() as term:
+            for index in range(self.height):
+                if index < len(self.lines):
+                    self._draw(index, *self.lines[index], True)
+                else:
+                    term.reset_colors()
+                    term.gotoXY(1, self.top + index)
+                    term.clear_eol()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Many progress bars, one per terminal line:
+#
+#   with Progress(term, top=2, fps=10) as progress:
+#       bar = progress.add(1000, "job 1")
+#       ...
+#       bar.update()       # from any thread
+#
+# Updates only change counters in memory. A render thread wakes at most fps
+# times per second and redraws, in one frame, the bars whose text changed.
+# Bars that do not fit between top and the last line are not drawn.
+
+import threading
+import time
+
+from .width import clip, text_width
+
+
+class Bar:
+    def __init__(self, total, label="", fg=None):
+        self.total = total
+        self.label = label
+        self.fg = fg
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def update(self, n=1):
+        with self._lock:
+            self.count += n
+
+    def set(self, count):
+        self.count = count
+
+    def text(self, width, fill="#", empty="-"):
+        """Returns the bar line, width cells wide."""
+        count = min(self.count, self.total) if self.total else self.count
+        if self.total:
+            suffix = " %3d%% %d/%d" % (count * 100 // self.total, count, self.total)
+        else:
+            suffix = " %d" % count
+        label = self.label + " " if self.label else ""
+        size = width - text_width(label) - len(suffix) - 2
+        if size < 1:
+            return clip(label + suffix.lstrip(), width)[0]
+        done = size * count // self.total if self.total else 0
+        return label + "[" + fill * done + empty * (size - done) + "]" + suffix
+
+
+class Progress:
+    def __init__(self, terminal, top=1, fps=10, width=None):
+        self.terminal = terminal
+        # First line used by the bars (1 based), one line per bar
+        self.top = top
+        self.fps = fps
+        self.width = width
+        self.fill = "#"
+        self.empty = "-"
+        self.bars = []
+        # Text on screen of each bar
+        self._shown = []
+        self._render_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.redraws = 0
+
+    def add(self, total, label="", fg=None):
+        bar = Bar(total, label, fg)
+        self.bars.append(bar)
+        return bar
+
+    def render(self):
+        """Redraws the bars whose text changed. Returns how many were drawn."""
+        with self._render_lock:
+            term = self.terminal
+            width = (self.width or term.columns()) - 1
+            # Drawing below the last line would scroll the screen
+            rows = max(0, term.lines() - self.top + 1)
+            changed = []
+            for i, bar in enumerate(self.bars[:rows]):
+                text = bar.text(width, self.fill, self.empty)
+                if i == len(self._shown):
+                    self._shown.append(None)
+                shown = self._shown[i]
+                if text != shown:
+                    # Erases what the new text does not cover
+                    pad = text_width(shown) - text_width(text) if shown else 0
+                    changed.append((i, bar, text + " " * pad if pad > 0 else text))
+                    self._shown[i] = text
+            if not changed:
+                return 0
+            # Bars are drawn in their own colors; the caller's style is selected again at the end
+            saved = (term.fg, term.bk, term.attrs)
+            with term.frame():
+                for i, bar, text in changed:
+                    term.gotoXY(1, self.top + i)
+                    term.set_style(bar.fg)
+                    term.print(text)
+                term.set_style(*saved)
+            self.redraws += len(changed)
+            return len(changed)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="colorconsole-progress", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops the render thread after drawing the final state."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.render()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        interval = 1.0 / self.fps
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.render()
+            self._stop.wait(max(0.0, interval - (time.monotonic() - started)))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Maps 24 bit colors to the nearest xterm 256 color index or colorconsole
+# 16 color number.
+#
+# The nearest color is precomputed once for a 32x32x32 cube of RGB values
+# (5 bits per channel), so each lookup is a single index. Distances are
+# measured in RGB or, with perceptual=True, in CIELAB (needs NumPy).
+# NumPy is optional: it builds the tables faster and quantize() works on arrays.
+
+from .ansi_codes import XTERM256_RGB
+from .sgr import FG_PARAMS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LUT_BITS = 5
+_SHIFT = 8 - LUT_BITS
+_STEPS = 1 << LUT_BITS
+
+# RGB of colorconsole colors 0 - 15 (1 is blue, 4 is red...)
+PALETTE_16 = tuple(XTERM256_RGB[int(FG_PARAMS[n][1]) + (8 if n >= 8 else 0)] for n in range(16))
+
+_tables = {}
+_arrays = {}
+
+
+def _srgb_to_lab(rgb):
+    # rgb is a Nx3 float array of 0 - 255 values, D65 white point
+    c = rgb / 255.0
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    xyz = c @ np.array(
+        [
+            [0.4124 / 0.95047, 0.2126, 0.0193 / 1.08883],
+            [0.3576 / 0.95047, 0.7152, 0.1192 / 1.08883],
+            [0.1805 / 0.95047, 0.0722, 0.9505 / 1.08883],
+        ]
+    )
+    f = np.where(xyz > 216 / 24389, np.cbrt(xyz), (24389 / 27 * xyz + 16) / 116)
+    return np.stack([116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]), 200 * (f[:, 1] - f[:, 2])], axis=1)
+
+
+def _samples():
+    # Center of every cube cell, in table order
+    centers = [(v << _SHIFT) + (1 << _SHIFT) // 2 for v in range(_STEPS)]
+    return [(r, g, b) for r in centers for g in centers for b in centers]
+
+
+def _build_numpy(palette, perceptual):
+    samples = np.array(_samples(), dtype=np.float64)
+    colors = np.array(palette, dtype=np.float64)
+    if perceptual:
+        samples = _srgb_to_lab(samples)
+        colors = _srgb_to_lab(colors)
+    table = np.empty(len(samples), dtype=np.uint8)
+    color_norms = (colors**2).sum(axis=1)
+    for start in range(0, len(samples), 4096):
+        chunk = samples[start : start + 4096]
+        distances = color_norms - 2 * chunk @ colors.T
+        table[start : start + 4096] = distances.argmin(axis=1)
+    return table.tobytes()
+
+
+def _nearest(palette, candidates, r, g, b):
+    best = None
+    best_distance = None
+    for n in candidates:
+        pr, pg, pb = palette[n]
+        distance = (pr - r) ** 2 + (pg - g) ** 2 + (pb - b) ** 2
+        if best_distance is None or distance < best_distance:
+            best = n
+            best_distance = distance
+    return best
+
+
+def _cube_level(v):
+    return 0 if v < 48 else 1 if v < 115 else (v - 35) // 40
+
+
+def _nearest_256(r, g, b):
+    # Nearest color of the 6x6x6 cube and of the gray ramp, then the 16 system colors
+    cube = 16 + 36 * _cube_level(r) + 6 * _cube_level(g) + _cube_level(b)
+    gray = 232 + min(max((r + g + b) // 3 - 3, 0) // 10, 23)
+    return _nearest(XTERM256_RGB, [cube, gray, min(gray + 1, 255)] + list(range(16)), r, g, b)
+
+
+def _build_python(colors):
+    if colors == 256:
+        return bytes(_nearest_256(*rgb) for rgb in _samples())
+    return bytes(_nearest(PALETTE_16, range(16), *rgb) for rgb in _samples())
+
+
+def lookup_table(colors=256, perceptual=False):
+    """Returns the bytes table indexed by (r >> 3) << 10 | (g >> 3) << 5 | b >> 3, built on first use.
+
+    Entries are xterm 256 color indexes for colors=256 and colorconsole colors for colors=16.
+    """
+    key = (colors, perceptual)
+    table = _tables.get(key)
+    if table is None:
+        if colors not in (16, 256):
+            raise ValueError("colors must be 16 or 256")
+        palette = XTERM256_RGB if colors == 256 else PALETTE_16
+        if np is not None:
+            table = _build_numpy(palette, perceptual)
+        elif perceptual:
+            raise ImportError("perceptual quantization requires NumPy")
+        else:
+            table = _build_python(colors)
+        _tables[key] = table
+    return table
+
+
+def _index(r, g, b):
+    return ((r & 0xFF) >> _SHIFT) << 10 | ((g & 0xFF) >> _SHIFT) << 5 | (b & 0xFF) >> _SHIFT
+
+
+def rgb_to_256(r, g, b, perceptual=False):
+    """Returns the xterm 256 color index nearest to r, g, b."""
+    return lookup_table(256, perceptual)[_index(r, g, b)]
+
+
+def rgb_to_16(r, g, b, perceptual=False):
+    """Returns the colorconsole color (0 - 15) nearest to r, g, b."""
+    return lookup_table(16, perceptual)[_index(r, g, b)]
+
+
+def quantize(image, colors=256, perceptual=False):
+    """Maps a ...x3 uint8 NumPy array of RGB values to an array of color indexes (uint8)."""
+    key = (colors, perceptual)
+    table = _arrays.get(key)
+    if table is None:
+        table = _arrays[key] = np.frombuffer(lookup_table(colors, perceptual), dtype=np.uint8)
+    image = np.asarray(image, dtype=np.uint8)
+    index = (image[..., 0] >> _SHIFT).astype(np.intp) << 10
+    index |= (image[..., 1] >> _SHIFT).astype(np.intp) << 5
+    index |= image[..., 2] >> _SHIFT
+    return table[index]
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Recording and replay of terminal output in asciicast v2 format
+# (https://docs.asciinema.org/manual/asciicast/v2/), so recordings also play
+# with asciinema:
+#
+#   term.start_recording("session.cast")
+#   ...
+#   term.stop_recording()
+#
+#   python -m colorconsole.recording play session.cast --speed 4
+#   python -m colorconsole.recording snapshots session.cast --interval 1
+#
+# Chunks written less than resolution seconds apart are merged into one event
+# and events are written to the file in blocks of buffer_size characters.
+# Replay reads the file line by line, so recordings can be larger than memory.
+
+import argparse
+import json
+import sys
+import time
+
+from .virtual import Emulator
+
+
+class Recorder:
+    def __init__(self, file, columns, lines, term=None, title=None, resolution=0.001, buffer_size=65536):
+        if isinstance(file, str):
+            self.file = open(file, "w", encoding="utf-8")
+            self._owned = True
+        else:
+            self.file = file
+            self._owned = False
+        self.resolution = resolution
+        self.buffer_size = buffer_size
+        header = {"version": 2, "width": columns, "height": lines, "timestamp": int(time.time())}
+        if term:
+            header["env"] = {"TERM": term}
+        if title:
+            header["title"] = title
+        self.file.write(json.dumps(header) + "\n")
+        self.start = time.monotonic()
+        # Event being built: its time and chunks
+        self._time = None
+        self._chunks = []
+        self._lines = []
+        self._size = 0
+        self.events = 0
+
+    def write(self, text):
+        now = time.monotonic() - self.start
+        if self._time is not None and now - self._time < self.resolution:
+            self._chunks.append(text)
+            return
+        self._end_event()
+        self._time = now
+        self._chunks.append(text)
+
+    def _end_event(self):
+        if not self._chunks:
+            return
+        line = '[%.6f, "o", %s]\n' % (self._time, json.dumps("".join(self._chunks), ensure_ascii=False))
+        self._chunks = []
+        self._lines.append(line)
+        self._size += len(line)
+        self.events += 1
+        if self._size >= self.buffer_size:
+            self._write_lines()
+
+    def _write_lines(self):
+        self.file.write("".join(self._lines))
+        self._lines = []
+        self._size = 0
+
+    def flush(self):
+        self._end_event()
+        self._write_lines()
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        if self._owned:
+            self.file.close()
+
+
+class Recording:
+    """Reads an asciicast v2 file: header is the first line, iterating gives (time, kind, data) events."""
+
+    def __init__(self, file):
+        if isinstance(file, str):
+            self.file = open(file, encoding="utf-8")
+            self._owned = True
+        else:
+            self.file = file
+            self._owned = False
+        self.header = json.loads(self.file.readline())
+        if self.header.get("version") != 2:
+            raise ValueError("Only asciicast version 2 recordings are supported")
+
+    def __iter__(self):
+        for line in self.file:
+            if line.strip():
+                event = json.loads(line)
+                yield event[0], event[1], event[2]
+
+    def close(self):
+        if self._owned:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def replay(file, speed=1.0, write=None, idle_limit=None):
+    """Writes the output of a recording with its original timing divided by speed.
+
+    speed=None replays as fast as possible. Pauses longer than idle_limit seconds are shortened to it.
+    """
+    if write is None:
+
+        def write(data):
+            sys.stdout.write(data)
+            sys.stdout.flush()
+
+    with Recording(file) as recording:
+        start = time.monotonic()
+        skipped = 0.0
+        last = 0.0
+        for when, kind, data in recording:
+            if kind != "o":
+                continue
+            if idle_limit is not None and when - last > idle_limit:
+                skipped += when - last - idle_limit
+            last = when
+            if speed:
+                delay = (when - skipped) / speed - (time.monotonic() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            write(data)
+
+
+def snapshots(file, interval=None):
+    """Plays a recording into a virtual.Emulator and yields (time, screen text).
+
+    Yields every interval seconds of recording time, or after every event when interval is None,
+    and once more at the end.
+    """
+    with Recording(file) as recording:
+        emulator = Emulator(recording.header["width"], recording.header["height"])
+        mark = interval
+        when = 0.0
+        changed = False
+        for when, kind, data in recording:
+            if kind != "o":
+                continue
+            while mark is not None and when >= mark:
+                yield mark, emulator.text()
+                mark += interval
+                changed = False
+            emulator.feed(data)
+            changed = True
+            if interval is None:
+                yield when, emulator.text()
+                changed = False
+        if changed:
+            yield when, emulator.text()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m colorconsole.recording", description="Replays recordings")
+    commands = parser.add_subparsers(dest="command", required=True)
+    play = commands.add_parser("play", help="writes the recording to this terminal")
+    play.add_argument("file")
+    play.add_argument("-s", "--speed", type=float, default=1.0, help="speed factor, 0 for as fast as possible")
+    play.add_argument("-i", "--idle-limit", type=float, help="longest pause, in seconds")
+    shots = commands.add_parser("snapshots", help="prints the screen as text along the recording")
+    shots.add_argument("file")
+    shots.add_argument("-i", "--interval", type=float, help="seconds between snapshots (default: every event)")
+    args = parser.parse_args(argv)
+    if args.command == "play":
+        replay(args.file, args.speed or None, idle_limit=args.idle_limit)
+    else:
+        for when, text in snapshots(args.file, args.interval):
+            print("--- %.3fs ---" % when)
+            print(text)
+
+
+if __name__ == "__main__":
+    main()
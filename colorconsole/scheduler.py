@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Frame scheduler: the application calls invalidate() whenever its data
+# changes and the render function runs at most once per frame interval.
+#
+#   scheduler = FrameScheduler(screen.flush, fps=30)
+#   scheduler.start()                 # render thread
+#   ...
+#   screen.print_at(0, 0, data)
+#   scheduler.invalidate()
+#
+# or, with asyncio:
+#
+#   asyncio.create_task(scheduler.run())
+#
+# With adaptive=True the interval grows when rendering gets slow, so writing
+# takes at most 1 / load of the time (the terminal is the bottleneck).
+
+import asyncio
+import threading
+import time
+from collections import deque
+
+
+class FrameScheduler:
+    def __init__(self, render, fps=30, adaptive=False, load=4):
+        self.render = render
+        self.fps = fps
+        self.adaptive = adaptive
+        self.load = load
+        self._dirty = False
+        self._stopping = False
+        self._last = 0.0
+        # Moving average of the render time
+        self._latency = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._loop = None
+        self._event = None
+        self.frames = 0
+        self.invalidations = 0
+        self.frame_times = deque(maxlen=1000)
+
+    def interval(self):
+        """Seconds between frames."""
+        interval = 1.0 / self.fps
+        if self.adaptive:
+            interval = max(interval, self._latency * self.load)
+        return interval
+
+    def invalidate(self):
+        """Asks for a frame. Can be called from any thread, as often as needed."""
+        self.invalidations += 1
+        if self._dirty:
+            return
+        self._dirty = True
+        self._signal()
+
+    def _signal(self):
+        self._wake.set()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._event.set)
+
+    def _delay(self):
+        return self._last + self.interval() - time.monotonic()
+
+    def _frame(self):
+        self._dirty = False
+        started = time.monotonic()
+        self.render()
+        finished = time.monotonic()
+        elapsed = finished - started
+        self._latency = elapsed if not self.frames else self._latency * 0.9 + elapsed * 0.1
+        self._last = finished
+        self.frames += 1
+        self.frame_times.append(elapsed)
+
+    def start(self):
+        """Renders from a daemon thread."""
+        if self._thread is None:
+            self._stopping = False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run_thread, name="colorconsole-frames", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops the driver. A pending frame is rendered first."""
+        self._stopping = True
+        self._stop.set()
+        self._signal()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run_thread(self):
+        while True:
+            self._wake.wait()
+            delay = self._delay()
+            if delay > 0 and not self._stopping:
+                self._stop.wait(delay)
+            self._wake.clear()
+            if self._dirty:
+                self._frame()
+            if self._stopping:
+                return
+
+    async def run(self):
+        """Renders from the running asyncio loop until stop()."""
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        self._stopping = False
+        if self._dirty:
+            self._event.set()
+        try:
+            while True:
+                await self._event.wait()
+                delay = self._delay()
+                if delay > 0 and not self._stopping:
+                    await asyncio.sleep(delay)
+                self._event.clear()
+                if self._dirty:
+                    self._frame()
+                if self._stopping:
+                    return
+        finally:
+            self._loop = None
+            self._event = None
+
+    def stats(self):
+        """Rendered frames, invalidations merged into them and frame time percentiles (seconds)."""
+        times = sorted(self.frame_times)
+
+        def percentile(p):
+            if not times:
+                return 0.0
+            return times[min(len(times) - 1, int(len(times) * p / 100))]
+
+        return {
+            "rendered": self.frames,
+            "invalidations": self.invalidations,
+            "skipped": max(0, self.invalidations - self.frames),
+            "interval": self.interval(),
+            "p50": percentile(50),
+            "p90": percentile(90),
+            "p99": percentile(99),
+            "max": times[-1] if times else 0.0,
+        }
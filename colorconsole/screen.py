@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Off-screen (double buffered) drawing surface for ANSI terminals.
+#
+# Drawing methods have the same names as the ones in ansi.Terminal, but only
+# change an in-memory grid of cells. flush() compares the grid with the last
+# frame sent to the terminal and writes only the cells that changed.
+# Cells are kept in a cells.CellBuffer: lines not written since the last
+# frame are skipped, the others are compared as array slices first.
+#
+# Coordinates are 0 based: (0, 0) is the top left cell.
+
+from array import array
+
+from .ansi_codes import CODES
+from .cells import CellBuffer, Tables, CLUSTER, CONTINUATION, SPACE, UTF32
+from .cursor import move_cursor
+from .width import char_width, clip
+from .sgr import (
+    sgr_transition,
+    color_256,
+    color_24bit,
+    BOLD,
+    ITALIC,
+    UNDERLINE,
+    BLINK,
+    REVERSE,
+    INVISIBLE,
+    CROSSED,
+)
+
+BLANK = (" ", None, None, 0)
+
+
+class Screen:
+    def __init__(self, terminal, columns=None, lines=None):
+        self.terminal = terminal
+        self.ncolumns = columns if columns is not None else terminal.columns()
+        self.nlines = lines if lines is not None else terminal.lines()
+        self.x = 0
+        self.y = 0
+        self.savedX = 0
+        self.savedY = 0
+        self.fg = None
+        self.bk = None
+        self.attrs = 0
+        self.buffer = CellBuffer(self.ncolumns, self.nlines)
+        # CellBuffer of the last frame sent to the terminal
+        self.last = None
+        self.pen = None
+
+    def columns(self):
+        return self.ncolumns
+
+    def lines(self):
+        return self.nlines
+
+    @property
+    def cells(self):
+        """The cells as lists of (ch, fg, bk, attrs) tuples, one per line (a copy)."""
+        return self.buffer.rows()
+
+    def cell(self, x, y):
+        return self.buffer.cell(x, y)
+
+    def snapshot(self):
+        """Returns a copy of the cells that restore() can bring back."""
+        return self.buffer.copy()
+
+    def restore(self, snapshot):
+        if snapshot.tables is not self.buffer.tables:
+            # A snapshot of another screen, or taken before the tables were compacted
+            buffer = snapshot.rebased(self.buffer.tables)
+        else:
+            buffer = snapshot.copy()
+        if (buffer.ncolumns, buffer.nlines) != (self.ncolumns, self.nlines):
+            buffer = buffer.resized(self.ncolumns, self.nlines, BLANK[1:])
+        buffer.dirty = bytearray(b"\x01") * self.nlines
+        self.buffer = buffer
+
+    def invalidate(self):
+        """Forgets the last frame, so the next flush repaints the whole screen."""
+        self.last = None
+
+    def resize(self, columns, lines):
+        self.buffer = self.buffer.resized(columns, lines, (None, self.bk, 0))
+        self.ncolumns = columns
+        self.nlines = lines
+        self.x = min(self.x, columns - 1)
+        self.y = min(self.y, lines - 1)
+        self.invalidate()
+
+    # Drawing
+
+    def set_color(self, fg=None, bk=None):
+        if fg is not None:
+            self.fg = fg
+        if bk is not None:
+            self.bk = bk
+
+    def cprint(self, fg, bk, text):
+        self.set_color(fg, bk)
+        self.print(text)
+
+    def print_at(self, x, y, text, width=None):
+        self.gotoXY(x, y)
+        if width is not None:
+            text = clip(str(text), width)[0]
+        self.print(text)
+
+    def putch(self, ch):
+        self.print(ch)
+
+    def print(self, text):
+        # Wide characters use two cells, the second one holds "".
+        # Combining characters are added to the previous cell. Control characters
+        # other than \n and \r are dropped: sent to the terminal, they would move
+        # the cursor or change colors without the grid knowing.
+        text = str(text)
+        buffer = self.buffer
+        chars, styles, dirty = buffer.chars, buffer.styles, buffer.dirty
+        style = buffer.tables.style_id((self.fg, self.bk, self.attrs))
+        x, y = self.x, self.y
+        columns, lines = self.ncolumns, self.nlines
+        narrow = text.isascii()
+        if narrow and x + len(text) <= columns and 0 <= y < lines and text.isprintable():
+            # A run of ASCII characters on one line: written as array slices
+            i = y * columns + x
+            end = i + len(text)
+            if x > 0 and chars[i] == CONTINUATION:
+                chars[i - 1] = SPACE
+            chars[i:end] = array("I", text.encode(UTF32))
+            styles[i:end] = array("I", [style]) * len(text)
+            if x + len(text) < columns and chars[end] == CONTINUATION:
+                chars[end] = SPACE
+            dirty[y] = 1
+            self.x = x + len(text)
+            return
+        for ch in text:
+            if ch == "\n":
+                x = 0
+                y += 1
+                continue
+            if ch == "\r":
+                x = 0
+                continue
+            if ch < " " or "\x7f" <= ch < "\xa0":
+                continue
+            width = 1 if narrow else char_width(ch)
+            if width == 0:
+                if 0 < x <= columns and 0 <= y < lines:
+                    i = y * columns + x - 1
+                    if x > 1 and chars[i] == CONTINUATION:
+                        i -= 1
+                    chars[i] = buffer.tables.code(buffer.tables.char(chars[i]) + ch)
+                    dirty[y] = 1
+                continue
+            if x + width > columns:
+                x = 0
+                y += 1
+            if 0 <= y < lines:
+                i = y * columns + x
+                if chars[i] == CONTINUATION and x > 0:
+                    # Overwrites the second half of a wide character
+                    chars[i - 1] = SPACE
+                chars[i] = ord(ch)
+                styles[i] = style
+                if width == 2:
+                    chars[i + 1] = CONTINUATION
+                    styles[i + 1] = style
+                if x + width < columns and chars[i + width] == CONTINUATION:
+                    chars[i + width] = SPACE
+                dirty[y] = 1
+            x += width
+        self.x, self.y = x, y
+
+    def clear(self):
+        self.buffer.fill((None, self.bk, 0))
+
+    def gotoXY(self, x, y):
+        self.x = max(0, min(int(x), self.ncolumns - 1))
+        self.y = max(0, min(int(y), self.nlines - 1))
+
+    def save_pos(self):
+        self.savedX = self.x
+        self.savedY = self.y
+
+    def restore_pos(self):
+        self.gotoXY(self.savedX, self.savedY)
+
+    def move_left(self, c=1):
+        self.gotoXY(self.x - c, self.y)
+
+    def move_right(self, c=1):
+        self.gotoXY(self.x + c, self.y)
+
+    def move_up(self, c=1):
+        self.gotoXY(self.x, self.y - c)
+
+    def move_down(self, c=1):
+        self.gotoXY(self.x, self.y + c)
+
+    def reset(self):
+        self.fg = None
+        self.bk = None
+        self.attrs = 0
+
+    def reset_colors(self):
+        self.reset()
+
+    def bold(self):
+        self.attrs |= BOLD
+
+    def underline(self):
+        self.attrs |= UNDERLINE
+
+    def underline_off(self):
+        self.attrs &= ~UNDERLINE
+
+    def blink(self):
+        self.attrs |= BLINK
+
+    def blink_off(self):
+        self.attrs &= ~BLINK
+
+    def reverse(self):
+        self.attrs |= REVERSE
+
+    def reverse_off(self):
+        self.attrs &= ~REVERSE
+
+    def italic(self):
+        self.attrs |= ITALIC
+
+    def italic_off(self):
+        self.attrs &= ~ITALIC
+
+    def crossed(self):
+        self.attrs |= CROSSED
+
+    def crossed_off(self):
+        self.attrs &= ~CROSSED
+
+    def invisible(self):
+        self.attrs |= INVISIBLE
+
+    def xterm256_set_fg_color(self, color):
+        self.fg = color_256(color)
+
+    def xterm24bit_set_fg_color(self, r, g, b):
+        self.fg = color_24bit(r, g, b)
+
+    def xterm256_set_bk_color(self, color):
+        self.bk = color_256(color)
+
+    def xterm24bit_set_bk_color(self, r, g, b):
+        self.bk = color_24bit(r, g, b)
+
+    def default_foreground(self):
+        self.fg = None
+
+    def default_background(self):
+        self.bk = None
+
+    # Output
+
+    def render(self, style=None):
+        """Returns the escape sequences that bring the terminal from the last frame to the current one.
+
+        style is the (fg, bk, attrs) state the terminal is known to be in, None if unknown.
+        Colors are reduced to the terminal's color_depth, or not sent at all when it is 0.
+        """
+        out = []
+        write = out.append
+        depth = getattr(self.terminal, "color_depth", 24)
+        buffer = self.buffer
+        tables = buffer.tables
+        char, style_table = tables.char, tables.styles
+        # pen is the style sent to the terminal, style the one of the cells it was sent for
+        pen = style
+        # Style ids are compared, style the tuple of sid
+        sid = tables.style_id(style) if style is not None else -1
+        if self.last is None:
+            sid = 0
+            style = BLANK[1:]
+            if depth:
+                write(sgr_transition(pen, style))
+                pen = style
+            write(CODES["clear"])
+            last = CellBuffer(self.ncolumns, self.nlines, tables=tables)
+            dirty = range(self.nlines)
+        else:
+            last = self.last
+            dirty = [y for y, flag in enumerate(buffer.dirty) if flag]
+        if depth and depth < 24:
+            degrade = self.terminal._degrade
+        region = getattr(self.terminal, "scroll_region", None)
+        # Terminal cursor (column, line), 1 based, None after writing the last column
+        cursor = None
+        columns = self.ncolumns
+        last_column = columns - 1
+        for y in dirty:
+            start = y * columns
+            end = start + columns
+            chars = buffer.chars[start:end]
+            styles = buffer.styles[start:end]
+            old_chars = last.chars[start:end]
+            old_styles = last.styles[start:end]
+            if chars == old_chars and styles == old_styles:
+                continue
+            line = y + 1
+            skip = 0
+            for x in range(columns):
+                if x < skip or (chars[x] == old_chars[x] and styles[x] == old_styles[x]):
+                    continue
+                if chars[x] == CONTINUATION and x > 0:
+                    # Only the second half of a wide character changed: sends the character again
+                    x -= 1
+                target = (x + 1, line)
+                if cursor != target:
+                    overwrite = None
+                    if cursor is not None and cursor[1] == line and 0 < x + 1 - cursor[0] <= 4:
+                        # Unchanged cells in between can be written again instead of moving
+                        gap = range(cursor[0] - 1, x)
+                        if all(styles[i] == sid for i in gap):
+                            overwrite = "".join(char(chars[i]) for i in gap)
+                    write(move_cursor(cursor, target, overwrite, region))
+                if styles[x] != sid:
+                    sid = styles[x]
+                    style = style_table[sid]
+                    if depth:
+                        cell_style = style
+                        if depth < 24:
+                            cell_style = (degrade(style[0]), degrade(style[1]), style[2])
+                        write(sgr_transition(pen, cell_style))
+                        pen = cell_style
+                code = chars[x]
+                write(chr(code) if 0 < code < CLUSTER else char(code))
+                width = 2 if x < last_column and chars[x + 1] == CONTINUATION else 1
+                skip = x + width
+                cursor = (x + 1 + width, line) if x + width <= last_column else None
+        buffer.clean()
+        if len(tables) > buffer.compact_limit():
+            # Drops the styles of old frames (animations...): only the ones on the screen are kept
+            buffer = self.buffer = buffer.rebased(Tables())
+        self.last = buffer.copy()
+        self.pen = pen
+        return "".join(out)
+
+    def flush(self):
+        term = self.terminal
+        out = self.render(term.sgr)
+        if out:
+            # Leaves the terminal with the style its own methods expect
+            state = (term.fg, term.bk, term.attrs)
+            if term.color_depth:
+                out += sgr_transition(self.pen, state)
+                term.sgr = state
+            term.write(out)
+            term.cursor = None
+            term.flush()
+        return len(out)
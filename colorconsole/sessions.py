@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Many terminal sessions (ptys, sockets) served from one asyncio loop:
+#
+#   manager = SessionManager()
+#   session = manager.open(fd, term="xterm-256color")   # the client's TERM
+#   term = session.terminal          # an ansi.Terminal writing to fd
+#   term.print_at(1, 1, "Hello")
+#   await session.drain()            # waits while too much output is queued
+#   async for key in session.keys():
+#       ...
+#
+# File descriptors are non-blocking. Output the fd does not take at once is
+# queued per session and written when the loop says the fd is writable, so a
+# slow console never blocks the others. drain() is the backpressure point,
+# as in asyncio streams: it waits while more than high_water bytes are queued,
+# until they go below low_water.
+#
+# A socket is not a tty and the server environment says nothing about the
+# client's terminal: pass its TERM (and color_depth if known) to open(), or
+# output has no colors.
+
+import asyncio
+import fcntl
+import os
+import pty
+import struct
+import termios
+
+from . import ansi
+from .capabilities import remote
+from .keys import KeyReader
+
+
+class SessionTerminal(ansi.Terminal):
+    def __init__(self, session, input_fd, output_fd, caps=None):
+        self.session = session
+        super().__init__(input_fd, output_fd, caps)
+
+    def _write_fd(self, text):
+        self.session.send(text.encode(self.encoding, "replace"))
+
+
+class Session:
+    def __init__(self, manager, input_fd, output_fd=None, close_fds=False, term=None, color_depth=None, caps=None):
+        self.manager = manager
+        self.input_fd = input_fd
+        self.output_fd = input_fd if output_fd is None else output_fd
+        self.close_fds = close_fds
+        self.loop = asyncio.get_running_loop()
+        os.set_blocking(self.output_fd, False)
+        if caps is None and (term is not None or color_depth is not None):
+            caps = remote(self.output_fd, term or "xterm", color_depth)
+        self.terminal = SessionTerminal(self, input_fd, self.output_fd, caps)
+        self._buffer = bytearray()
+        self._writing = False
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self.closed = False
+        # OSError that closed the session (the other side went away)
+        self.error = None
+        self.bytes_written = 0
+        self.writes = 0
+        self.pauses = 0
+
+    @property
+    def buffered(self):
+        """Bytes waiting for the fd to become writable."""
+        return len(self._buffer)
+
+    def send(self, data):
+        if self.closed or not data:
+            return
+        if not self._buffer:
+            # Nothing queued: try to write at once
+            written = self._write(data)
+            if written is None or written == len(data):
+                return
+            data = data[written:]
+        self._buffer += data
+        if not self._writing:
+            self._writing = True
+            self.loop.add_writer(self.output_fd, self._on_writable)
+        if len(self._buffer) > self.manager.high_water:
+            self._drained.clear()
+
+    def _write(self, data):
+        # Returns the number of bytes written, None if the session was closed
+        try:
+            written = os.write(self.output_fd, data)
+        except BlockingIOError:
+            return 0
+        except OSError as e:
+            self.error = e
+            self.close()
+            return None
+        self.writes += 1
+        self.bytes_written += written
+        if self.terminal.metrics is not None:
+            self.terminal.metrics.syscall(written)
+        return written
+
+    def _on_writable(self):
+        written = self._write(self._buffer[:65536])
+        if written is None:
+            return
+        del self._buffer[:written]
+        if not self._buffer:
+            self._writing = False
+            self.loop.remove_writer(self.output_fd)
+        if len(self._buffer) <= self.manager.low_water:
+            self._drained.set()
+
+    async def drain(self):
+        """Waits while more than manager.high_water bytes are queued."""
+        if len(self._buffer) > self.manager.high_water and not self.closed:
+            self.pauses += 1
+            self._drained.clear()
+        await self._drained.wait()
+
+    def keys(self, escape_timeout=0.05):
+        """Returns an asynchronous iterator of keys.Key events typed on this session."""
+        return KeyReader(self.input_fd, escape_timeout)
+
+    def resize(self, columns, lines):
+        self.terminal.resize(columns, lines)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self._writing:
+            self.loop.remove_writer(self.output_fd)
+            self._writing = False
+        self._buffer.clear()
+        self._drained.set()
+        try:
+            self.terminal.restore_buffered_mode()
+        except (termios.error, OSError):
+            pass
+        if self.close_fds:
+            for fd in {self.input_fd, self.output_fd}:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        if self in self.manager.sessions:
+            self.manager.sessions.remove(self)
+
+    def stats(self):
+        return {
+            "buffered": len(self._buffer),
+            "bytes_written": self.bytes_written,
+            "writes": self.writes,
+            "pauses": self.pauses,
+            "closed": self.closed,
+        }
+
+
+class SessionManager:
+    def __init__(self, high_water=256 * 1024, low_water=64 * 1024):
+        self.high_water = high_water
+        self.low_water = low_water
+        self.sessions = []
+
+    def open(self, input_fd, output_fd=None, close_fds=False, term=None, color_depth=None, caps=None):
+        """Returns a Session for input_fd (and output_fd if different). Call it from the running loop.
+
+        term is the client's TERM and color_depth its colors (24, 8, 4 or 0), caps all its capabilities.
+        Without them, the fd and the server environment are probed.
+        """
+        session = Session(self, input_fd, output_fd, close_fds, term, color_depth, caps)
+        self.sessions.append(session)
+        return session
+
+    def open_pty(self, columns=80, lines=24, term=None, color_depth=None):
+        """Opens a pseudo terminal. Returns (session, master fd): the master side sees what a console would."""
+        master, slave = pty.openpty()
+        fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack("HHHH", lines, columns, 0, 0))
+        return self.open(slave, close_fds=True, term=term, color_depth=color_depth), master
+
+    async def drain(self):
+        """Waits until no session is over high_water."""
+        await asyncio.gather(*(session.drain() for session in list(self.sessions)))
+
+    def stats(self):
+        sessions = [session.stats() for session in self.sessions]
+        return {
+            "sessions": len(sessions),
+            "buffered": sum(s["buffered"] for s in sessions),
+            "bytes_written": sum(s["bytes_written"] for s in sessions),
+            "pauses": sum(s["pauses"] for s in sessions),
+        }
+
+    def close(self):
+        for session in list(self.sessions):
+            session.close()
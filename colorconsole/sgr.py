@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Select Graphic Rendition (SGR) helpers.
+#
+# A color is stored as a single int so it can be compared and packed cheaply:
+#   None                      default terminal color
+#   0 - 15                    colorconsole 16 color numbers (see terminal.colors)
+#   COLOR_256 | n             xterm 256 color n
+#   COLOR_24BIT | 0xRRGGBB    24 bit color
+
+from .ansi_codes import (
+    ESCAPE,
+    XTERM256_RGB,
+    COLORS_FG,
+    COLORS_BK,
+    COLORS_FG_BK,
+    XTERM256_FG,
+    XTERM256_BK,
+    xterm24bit_fg,
+    xterm24bit_bk,
+)
+
+COLOR_256 = 0x100
+COLOR_24BIT = 0x1000000
+
+BOLD = 0x01
+DIM = 0x02
+ITALIC = 0x04
+UNDERLINE = 0x08
+BLINK = 0x10
+REVERSE = 0x20
+INVISIBLE = 0x40
+CROSSED = 0x80
+
+ATTRIBUTE_CODES = (
+    (BOLD, "1"),
+    (DIM, "2"),
+    (ITALIC, "3"),
+    (UNDERLINE, "4"),
+    (BLINK, "5"),
+    (REVERSE, "7"),
+    (INVISIBLE, "8"),
+    (CROSSED, "9"),
+)
+
+ATTRIBUTE_OFF_CODES = (
+    (ITALIC, "23"),
+    (UNDERLINE, "24"),
+    (BLINK, "25"),
+    (REVERSE, "27"),
+    (INVISIBLE, "28"),
+    (CROSSED, "29"),
+)
+
+# "0;31m" -> "31", "1;31m" -> "31" (brightness comes from bold)
+FG_PARAMS = {k: v[2:-1] for k, v in COLORS_FG.items()}
+BK_PARAMS = {k: v[:-1] for k, v in COLORS_BK.items()}
+FG256_PARAMS = tuple(s[2:-1] for s in XTERM256_FG)
+BK256_PARAMS = tuple(s[2:-1] for s in XTERM256_BK)
+
+# Sequences that change only one color, leaving attributes alone
+FG_SEQUENCES = {k: ESCAPE + v + "m" for k, v in FG_PARAMS.items()}
+BK_SEQUENCES = {k: ESCAPE + v + "m" for k, v in BK_PARAMS.items()}
+FG_SEQUENCES[None] = ESCAPE + "39m"
+BK_SEQUENCES[None] = ESCAPE + "49m"
+
+
+def color_256(n):
+    return COLOR_256 | (n & 0xFF)
+
+
+def color_24bit(r, g, b):
+    return COLOR_24BIT | ((r & 0xFF) << 16) | ((g & 0xFF) << 8) | (b & 0xFF)
+
+
+def degrade(color, depth):
+    """Returns the color nearest to color that a terminal with depth (24, 8 or 4) bits can show."""
+    if color is None or color < COLOR_256:
+        return color
+    from .quantize import rgb_to_256, rgb_to_16
+
+    if color < COLOR_24BIT:
+        if depth >= 8:
+            return color
+        return rgb_to_16(*XTERM256_RGB[color & 0xFF])
+    r, g, b = (color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF
+    if depth >= 24:
+        return color
+    if depth >= 8:
+        return COLOR_256 | rgb_to_256(r, g, b)
+    return rgb_to_16(r, g, b)
+
+
+def fg_param(color):
+    if color < COLOR_256:
+        return FG_PARAMS[color]
+    if color < COLOR_24BIT:
+        return FG256_PARAMS[color & 0xFF]
+    return xterm24bit_fg(color & 0xFFFFFF)[2:-1]
+
+
+def bk_param(color):
+    if color < COLOR_256:
+        return BK_PARAMS[color]
+    if color < COLOR_24BIT:
+        return BK256_PARAMS[color & 0xFF]
+    return xterm24bit_bk(color & 0xFFFFFF)[2:-1]
+
+
+def fg_sequence(color):
+    """Returns the sequence that only changes the foreground color."""
+    if color is None or color < COLOR_256:
+        return FG_SEQUENCES[color]
+    if color < COLOR_24BIT:
+        return XTERM256_FG[color & 0xFF]
+    return xterm24bit_fg(color & 0xFFFFFF)
+
+
+def bk_sequence(color):
+    """Returns the sequence that only changes the background color."""
+    if color is None or color < COLOR_256:
+        return BK_SEQUENCES[color]
+    if color < COLOR_24BIT:
+        return XTERM256_BK[color & 0xFF]
+    return xterm24bit_bk(color & 0xFFFFFF)
+
+
+def sgr_sequence(fg, bk, attrs):
+    """Returns a single escape sequence that resets the terminal and selects fg, bk and attrs."""
+    if fg is not None and fg < 16:
+        if fg >= 8:
+            attrs |= BOLD
+        elif bk is not None and bk < 16 and not attrs:
+            # Only the normal colors start with a reset ("0;31;40m"), bright ones are "1;31;40m"
+            return COLORS_FG_BK[fg][bk]
+    params = ["0"]
+    for bit, code in ATTRIBUTE_CODES:
+        if attrs & bit:
+            params.append(code)
+    if fg is not None:
+        params.append(fg_param(fg))
+    if bk is not None:
+        params.append(bk_param(bk))
+    return ESCAPE + ";".join(params) + "m"
+
+
+def sgr_transition(old, new):
+    """Returns the shortest escape sequence that changes the (fg, bk, attrs) state old into new.
+
+    old is None when the terminal state is unknown. Returns "" if nothing changes.
+    """
+    if old == new:
+        return ""
+    if old is None:
+        return sgr_sequence(*new)
+    ofg, obk, oattrs = old
+    nfg, nbk, nattrs = new
+    if ofg is not None and 8 <= ofg < 16:
+        oattrs |= BOLD
+    if nfg is not None and 8 <= nfg < 16:
+        nattrs |= BOLD
+    if oattrs == nattrs:
+        # Only one color changed: a single lookup
+        if obk == nbk:
+            return fg_sequence(nfg)
+        if ofg == nfg:
+            return bk_sequence(nbk)
+    full = sgr_sequence(*new)
+    params = []
+    off = oattrs & ~nattrs
+    on = nattrs & ~oattrs
+    if off & (BOLD | DIM):
+        # 22 turns off both bold and dim
+        params.append("22")
+        on |= nattrs & (BOLD | DIM)
+    for bit, code in ATTRIBUTE_OFF_CODES:
+        if off & bit:
+            params.append(code)
+    for bit, code in ATTRIBUTE_CODES:
+        if on & bit:
+            params.append(code)
+    if nfg != ofg:
+        params.append("39" if nfg is None else fg_param(nfg))
+    if nbk != obk:
+        params.append("49" if nbk is None else bk_param(nbk))
+    if not params:
+        return ""
+    incremental = ESCAPE + ";".join(params) + "m"
+    return incremental if len(incremental) <= len(full) else full
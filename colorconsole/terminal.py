@@ -52,6 +52,9 @@ color_numbers_to_names = {v: k for k, v in colors.items()}
 def make_ansi():
     import colorconsole.ansi
 
+    if not _stdin_isatty():
+        # Input redirected from a file or pipe: read from it, there are no terminal modes to set
+        return colorconsole.ansi.Terminal(input_fd=_stdin_fd())
     return colorconsole.ansi.Terminal()
 
 
@@ -67,7 +70,30 @@ def make_winconsole():
     return colorconsole.win.Terminal()
 
 
-def get_terminal(conEmu=False):
+def make_virtual(columns=80, lines=24):
+    import colorconsole.virtual
+
+    return colorconsole.virtual.Terminal(columns, lines)
+
+
+def _stdin_fd():
+    try:
+        return sys.stdin.fileno()
+    except (AttributeError, ValueError, OSError):
+        return os.open(os.devnull, os.O_RDONLY)
+
+
+def _stdin_isatty():
+    try:
+        return os.isatty(sys.stdin.fileno())
+    except (AttributeError, ValueError, OSError):
+        return False
+
+
+def get_terminal(conEmu=False, virtual=False):
+    """Returns the terminal for this platform, or a virtual (in memory) one if asked."""
+    if virtual:
+        return make_virtual()
     if os.name == "posix":
         return make_ansi()
     elif os.name == "nt":
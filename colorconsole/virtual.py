@@ -0,0 +1,604 @@
+#!/usr/bin/env python
+#
+#    colorconsole
+#    Copyright © 2010-2022 Nilo Menezes
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+# Headless terminal: output is interpreted into an in-memory grid of cells
+# instead of going to a tty, so programs can run (and be checked) under
+# tests, cron or CI.
+#
+#   term = virtual.Terminal(80, 24)
+#   term.print_at(1, 1, "Hello")
+#   term.emulator.cell(0, 0)     # ("H", None, None, 0)
+#   term.text()                  # the screen as text
+#
+# Cells are (ch, fg, bk, attrs) tuples, like the ones of screen.Screen, with
+# colors packed as in sgr.py. Terminals show bold 16 colors as bright ones,
+# so ESC[1;31m gives the bright red (12) colorconsole sends for LRED.
+# Key input comes from feed_input().
+
+import asyncio
+import codecs
+import re
+from collections import deque
+from itertools import repeat
+
+from . import ansi
+from .ansi_parser import AnsiParser, parse_sequence, SGR, CSI, OSC
+from .capabilities import Capabilities
+from .keys import KeyInput
+from .width import char_width
+from .sgr import (
+    color_256,
+    color_24bit,
+    BOLD,
+    DIM,
+    ITALIC,
+    UNDERLINE,
+    BLINK,
+    REVERSE,
+    INVISIBLE,
+    CROSSED,
+)
+
+BLANK = (" ", None, None, 0)
+
+# ANSI color index (30 + n) to colorconsole color number
+ANSI_COLORS = (0, 4, 2, 6, 1, 5, 3, 7)
+
+SGR_ON = {1: BOLD, 2: DIM, 3: ITALIC, 4: UNDERLINE, 5: BLINK, 6: BLINK, 7: REVERSE, 8: INVISIBLE, 9: CROSSED}
+SGR_OFF = {22: BOLD | DIM, 23: ITALIC, 24: UNDERLINE, 25: BLINK, 27: REVERSE, 28: INVISIBLE, 29: CROSSED}
+
+ACTION_CACHE_SIZE = 4096
+
+_CONTROLS = re.compile(r"([\x00-\x1f\x7f])")
+
+
+def apply_sgr(params, fg, bk, attrs):
+    """Returns the (fg, bk, attrs) style after the SGR params (a list of ints)."""
+    i = 0
+    n = len(params)
+    while i < n:
+        p = params[i]
+        if p == 0:
+            fg = bk = None
+            attrs = 0
+        elif 30 <= p <= 37:
+            fg = ANSI_COLORS[p - 30]
+        elif 40 <= p <= 47:
+            bk = ANSI_COLORS[p - 40]
+        elif 90 <= p <= 97:
+            fg = ANSI_COLORS[p - 90] + 8
+        elif 100 <= p <= 107:
+            bk = ANSI_COLORS[p - 100] + 8
+        elif p in SGR_ON:
+            attrs |= SGR_ON[p]
+        elif p in SGR_OFF:
+            attrs &= ~SGR_OFF[p]
+        elif p == 39:
+            fg = None
+        elif p == 49:
+            bk = None
+        elif p == 38 or p == 48:
+            color = None
+            if i + 2 < n and params[i + 1] == 5:
+                color = color_256(params[i + 2])
+                i += 2
+            elif i + 4 < n and params[i + 1] == 2:
+                color = color_24bit(params[i + 2], params[i + 3], params[i + 4])
+                i += 4
+            if p == 38:
+                fg = color
+            else:
+                bk = color
+        i += 1
+    return fg, bk, attrs
+
+
+class Emulator:
+    """Interprets text and escape sequences into a grid of cells (0 based coordinates)."""
+
+    def __init__(self, columns=80, lines=24):
+        self.ncolumns = columns
+        self.nlines = lines
+        self.cells = [[BLANK] * columns for _ in range(lines)]
+        self.x = 0
+        self.y = 0
+        # Set after writing the last column: the next character goes to the next line
+        self.wrap_pending = False
+        self.saved = (0, 0)
+        # Scroll region (DECSTBM), first and last line
+        self.top = 0
+        self.bottom = lines - 1
+        self.fg = None
+        self.bk = None
+        self.attrs = 0
+        self.title = ""
+        # Last character written, for REP
+        self.last_char = None
+        # Private modes set by ESC[?...h and ESC[?...l, "?2004": True
+        self.modes = {}
+        self.parser = AnsiParser()
+        # Escape sequence -> (handler, argument), programs send the same ones again and again
+        self._actions = {}
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._csi = {
+            "A": self._cursor_up,
+            "B": self._cursor_down,
+            "C": self._cursor_right,
+            "D": self._cursor_left,
+            "E": self._next_line,
+            "F": self._previous_line,
+            "G": self._column,
+            "H": self._goto,
+            "f": self._goto,
+            "d": self._line,
+            "J": self._erase_display,
+            "K": self._erase_line,
+            "s": self._save,
+            "u": self._restore,
+            "r": self._scroll_region,
+            "L": self._insert_lines,
+            "M": self._delete_lines,
+            "S": self._scroll_up_lines,
+            "T": self._scroll_down_lines,
+            "X": self._erase_chars,
+            "b": self._repeat,
+        }
+
+    def feed(self, data):
+        """Interprets str or bytes (UTF-8) output. Sequences can be split between calls."""
+        if isinstance(data, bytes):
+            data = self._decoder.decode(data)
+        actions = self._actions
+        for i, part in enumerate(self.parser.split(data)):
+            if i & 1:
+                action = actions.get(part)
+                if action is None:
+                    if len(actions) >= ACTION_CACHE_SIZE:
+                        actions.clear()
+                    action = actions[part] = self._action(parse_sequence(part))
+                handler, argument = action
+                if handler is not None:
+                    handler(argument)
+            elif part:
+                self._text(part)
+
+    def _action(self, event):
+        kind = type(event)
+        if kind is SGR:
+            if event.params[0] == 0:
+                # Starts with a reset, the result does not depend on the current style
+                return self._set_sgr, apply_sgr(event.params, None, None, 0)
+            return self._sgr, event.params
+        if kind is OSC:
+            return self._osc, event.text
+        if kind is not CSI:
+            return self._escape, event.data
+        params = event.params
+        if event.intermediates:
+            return None, None
+        if params and params[0] in "<=>?":
+            if event.final in "hl":
+                return self._set_modes, [(params[0] + mode, event.final == "h") for mode in params[1:].split(";")]
+            return None, None
+        handler = self._csi.get(event.final)
+        args = [int(p) if p.isdigit() else 0 for p in params.split(";")] if params else []
+        return handler, args
+
+    # Contents
+
+    def cell(self, x, y):
+        return self.cells[y][x]
+
+    def rows(self):
+        """Returns the characters of each line."""
+        return ["".join(cell[0] for cell in row) for row in self.cells]
+
+    def text(self):
+        """Returns the screen as text, without trailing spaces."""
+        return "\n".join(row.rstrip() for row in self.rows())
+
+    def resize(self, columns, lines):
+        cells = [[BLANK] * columns for _ in range(lines)]
+        for y, row in enumerate(self.cells[:lines]):
+            cells[y][: min(columns, self.ncolumns)] = row[:columns]
+        self.cells = cells
+        self.ncolumns = columns
+        self.nlines = lines
+        self.x = min(self.x, columns - 1)
+        self.y = min(self.y, lines - 1)
+        self.top = 0
+        self.bottom = lines - 1
+        self.wrap_pending = False
+
+    def reset(self):
+        self.__init__(self.ncolumns, self.nlines)
+
+    # Text
+
+    def _style(self):
+        fg = self.fg
+        if fg is not None and fg < 8 and self.attrs & BOLD:
+            fg += 8
+        return fg, self.bk, self.attrs
+
+    def _blank(self):
+        # Erased cells get the current background
+        return (" ", None, self.bk, 0) if self.bk is not None else BLANK
+
+    def _text(self, text):
+        if text.isprintable():
+            self._put(text)
+            return
+        for i, part in enumerate(_CONTROLS.split(text)):
+            if i & 1:
+                self._control(part)
+            elif part:
+                self._put(part)
+
+    def _control(self, ch):
+        if ch == "\n" or ch == "\x0b" or ch == "\x0c":
+            # Output goes through a tty, which turns \n into \r\n
+            self.x = 0
+            self.wrap_pending = False
+            self._linefeed()
+        elif ch == "\r":
+            self.x = 0
+            self.wrap_pending = False
+        elif ch == "\b":
+            self.x = max(self.x - 1, 0)
+            self.wrap_pending = False
+        elif ch == "\t":
+            self.x = min((self.x // 8 + 1) * 8, self.ncolumns - 1)
+
+    def _linefeed(self):
+        if self.y == self.bottom:
+            self._scroll_up()
+        elif self.y < self.nlines - 1:
+            self.y += 1
+
+    def _scroll_up(self, n=1, top=None):
+        # Scrolls the lines from top (the scroll region top by default) to the region bottom
+        top = self.top if top is None else top
+        n = min(n, self.bottom + 1 - top)
+        del self.cells[top : top + n]
+        for _ in range(n):
+            self.cells.insert(self.bottom + 1 - n, [self._blank()] * self.ncolumns)
+
+    def _scroll_down(self, n=1, top=None):
+        top = self.top if top is None else top
+        n = min(n, self.bottom + 1 - top)
+        del self.cells[self.bottom + 1 - n : self.bottom + 1]
+        for _ in range(n):
+            self.cells.insert(top, [self._blank()] * self.ncolumns)
+
+    def _wrap(self):
+        self.wrap_pending = False
+        self.x = 0
+        self._linefeed()
+
+    def _put(self, text):
+        fg, bk, attrs = self._style()
+        columns = self.ncolumns
+        self.last_char = text[-1]
+        if text.isascii():
+            n = len(text)
+            x = self.x
+            if not self.wrap_pending and x + n < columns:
+                # Fits in the line
+                row = self.cells[self.y]
+                if x > 0 and row[x][0] == "":
+                    row[x - 1] = (" ",) + row[x - 1][1:]
+                row[x : x + n] = zip(text, repeat(fg, n), repeat(bk, n), repeat(attrs, n))
+                if row[x + n][0] == "":
+                    row[x + n] = (" ",) + row[x + n][1:]
+                self.x = x + n
+                return
+            i = 0
+            while i < n:
+                if self.wrap_pending:
+                    self._wrap()
+                x = self.x
+                row = self.cells[self.y]
+                k = min(n - i, columns - x)
+                if x > 0 and row[x][0] == "":
+                    # Overwrites the second half of a wide character
+                    row[x - 1] = (" ",) + row[x - 1][1:]
+                row[x : x + k] = zip(text[i : i + k], repeat(fg, k), repeat(bk, k), repeat(attrs, k))
+                end = x + k
+                if end < columns and row[end][0] == "":
+                    row[end] = (" ",) + row[end][1:]
+                i += k
+                if end >= columns:
+                    self.x = columns - 1
+                    self.wrap_pending = True
+                else:
+                    self.x = end
+            return
+        for ch in text:
+            width = char_width(ch)
+            if width == 0:
+                self._combine(ch)
+                continue
+            if self.wrap_pending or self.x + width > columns:
+                self._wrap()
+            x = self.x
+            row = self.cells[self.y]
+            if x > 0 and row[x][0] == "":
+                row[x - 1] = (" ",) + row[x - 1][1:]
+            row[x] = (ch, fg, bk, attrs)
+            if width == 2:
+                row[x + 1] = ("", fg, bk, attrs)
+            end = x + width
+            if end < columns and row[end][0] == "":
+                row[end] = (" ",) + row[end][1:]
+            if end >= columns:
+                self.x = columns - 1
+                self.wrap_pending = True
+            else:
+                self.x = end
+
+    def _combine(self, ch):
+        # Combining characters join the cell written last
+        x = self.x if self.wrap_pending else self.x - 1
+        if x < 0:
+            return
+        row = self.cells[self.y]
+        if x > 0 and row[x][0] == "":
+            x -= 1
+        row[x] = (row[x][0] + ch,) + row[x][1:]
+
+    # Escape sequences
+
+    def _sgr(self, params):
+        self.fg, self.bk, self.attrs = apply_sgr(params, self.fg, self.bk, self.attrs)
+
+    def _set_sgr(self, state):
+        self.fg, self.bk, self.attrs = state
+
+    def _set_modes(self, modes):
+        self.modes.update(modes)
+
+    def _osc(self, text):
+        code, _, value = text.partition(";")
+        if code in ("0", "2"):
+            self.title = value
+
+    def _escape(self, data):
+        final = data[-1:]
+        if final == "7":
+            self._save(())
+        elif final == "8":
+            self._restore(())
+        elif final == "D":
+            self._linefeed()
+        elif final == "E":
+            self.x = 0
+            self._linefeed()
+        elif final == "M":
+            if self.y == self.top:
+                self._scroll_down()
+            else:
+                self.y -= 1
+        elif final == "c":
+            self.reset()
+            return
+        self.wrap_pending = False
+
+    @staticmethod
+    def _arg(args, i=0, default=1):
+        return args[i] if i < len(args) and args[i] else default
+
+    def _move(self, x, y):
+        self.x = min(max(x, 0), self.ncolumns - 1)
+        self.y = min(max(y, 0), self.nlines - 1)
+        self.wrap_pending = False
+
+    def _cursor_up(self, args):
+        self._move(self.x, self.y - self._arg(args))
+
+    def _cursor_down(self, args):
+        self._move(self.x, self.y + self._arg(args))
+
+    def _cursor_right(self, args):
+        self._move(self.x + self._arg(args), self.y)
+
+    def _cursor_left(self, args):
+        self._move(self.x - self._arg(args), self.y)
+
+    def _next_line(self, args):
+        self._move(0, self.y + self._arg(args))
+
+    def _previous_line(self, args):
+        self._move(0, self.y - self._arg(args))
+
+    def _column(self, args):
+        self._move(self._arg(args) - 1, self.y)
+
+    def _line(self, args):
+        self._move(self.x, self._arg(args) - 1)
+
+    def _goto(self, args):
+        self._move(self._arg(args, 1) - 1, self._arg(args) - 1)
+
+    def _save(self, args):
+        self.saved = (self.x, self.y)
+
+    def _restore(self, args):
+        self._move(*self.saved)
+
+    def _scroll_region(self, args):
+        top = self._arg(args, 0) - 1
+        bottom = self._arg(args, 1, self.nlines) - 1
+        if 0 <= top < bottom < self.nlines:
+            self.top = top
+            self.bottom = bottom
+            self._move(0, 0)
+
+    def _insert_lines(self, args):
+        if self.top <= self.y <= self.bottom:
+            self._scroll_down(self._arg(args), self.y)
+            self._move(0, self.y)
+
+    def _delete_lines(self, args):
+        if self.top <= self.y <= self.bottom:
+            self._scroll_up(self._arg(args), self.y)
+            self._move(0, self.y)
+
+    def _scroll_up_lines(self, args):
+        self._scroll_up(self._arg(args))
+
+    def _scroll_down_lines(self, args):
+        self._scroll_down(self._arg(args))
+
+    def _erase_chars(self, args):
+        row = self.cells[self.y]
+        end = min(self.x + self._arg(args), self.ncolumns)
+        row[self.x : end] = repeat(self._blank(), end - self.x)
+
+    def _repeat(self, args):
+        if self.last_char is not None:
+            self._put(self.last_char * self._arg(args))
+
+    def _erase_display(self, args):
+        mode = self._arg(args, 0, 0)
+        blank = self._blank()
+        if mode == 0:
+            self._erase_line(args)
+            rows = range(self.y + 1, self.nlines)
+        elif mode == 1:
+            self._erase_line(args)
+            rows = range(self.y)
+        else:
+            rows = range(self.nlines)
+        for y in rows:
+            self.cells[y] = [blank] * self.ncolumns
+
+    def _erase_line(self, args):
+        mode = self._arg(args, 0, 0)
+        row = self.cells[self.y]
+        blank = self._blank()
+        if mode == 0:
+            row[self.x :] = repeat(blank, self.ncolumns - self.x)
+        elif mode == 1:
+            row[: self.x + 1] = repeat(blank, self.x + 1)
+        else:
+            row[:] = repeat(blank, self.ncolumns)
+
+
+class VirtualInput(KeyInput):
+    """KeyInput reading the data given to push() instead of a file descriptor."""
+
+    def __init__(self, escape_timeout=0):
+        super().__init__(None, escape_timeout)
+        self.data = deque()
+
+    def push(self, data):
+        self.data.append(data)
+
+    def _fill(self, timeout):
+        if not self.data:
+            if timeout is None:
+                # Nothing else will ever arrive
+                self.eof = True
+                return True
+            return False
+        while self.data:
+            self.keys.extend(self.decoder.feed(self.data.popleft()))
+        self.keys.extend(self.decoder.flush())
+        return True
+
+
+class Terminal(ansi.Terminal):
+    def __init__(self, columns=80, lines=24, color_depth=24):
+        self.emulator = Emulator(columns, lines)
+        self._color_depth = color_depth
+        super().__init__()
+
+    def _detect(self):
+        return Capabilities(
+            term="xterm-256color",
+            isatty=False,
+            color_depth=self._color_depth,
+            titles=True,
+            columns=self.emulator.ncolumns,
+            lines=self.emulator.nlines,
+            erase_chars=True,
+            repeat=True,
+            bce=True,
+        )
+
+    def _open_input(self):
+        self.fd = None
+        self.new_term = None
+        self.old_term = None
+
+    def _send(self, text):
+        self.emulator.feed(text)
+
+    def flush(self):
+        if self._frame is not None:
+            self._flush_frame()
+
+    def _write_frame(self, text):
+        self.emulator.feed(text)
+
+    def restore_buffered_mode(self):
+        pass
+
+    def enable_unbuffered_input_mode(self):
+        pass
+
+    @property
+    def input(self):
+        if self._input is None:
+            self._input = VirtualInput()
+        return self._input
+
+    def feed_input(self, data):
+        """Queues str or bytes as if typed on the keyboard."""
+        self.input.push(data)
+
+    async def _keys(self, interval):
+        while True:
+            key = self.input.read_key(0)
+            if key is None:
+                await asyncio.sleep(interval)
+            else:
+                yield key
+
+    def keys(self, escape_timeout=0.05):
+        return self._keys(escape_timeout)
+
+    def set_title(self, title):
+        self.write("\x1b]2;" + str(title) + "\x07")
+
+    def columns(self):
+        return self.emulator.ncolumns
+
+    def lines(self):
+        return self.emulator.nlines
+
+    def resize(self, columns, lines):
+        self.emulator.resize(columns, lines)
+        self.ncolumns = columns
+        self.nlines = lines
+
+    def text(self):
+        """Returns the screen as text, without trailing spaces."""
+        return self.emulator.text()
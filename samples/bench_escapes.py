@@ -0,0 +1,45 @@
+#  Micro-benchmarks: building escape sequences by formatting against the precomputed tables.
+import timeit
+
+from colorconsole.ansi_codes import (
+    ESCAPE,
+    COLORS_FG,
+    COLORS_BK,
+    COLORS_FG_BK,
+    XTERM256_FG,
+    xterm24bit_bk,
+)
+
+N = 1_000_000
+
+BENCHMARKS = [
+    (
+        "256 color fg",
+        lambda: [ESCAPE + "38;5;%dm" % (n & 0xFF) for n in range(N)],
+        lambda: [XTERM256_FG[n & 0xFF] for n in range(N)],
+    ),
+    (
+        "24 bit bk (repeated colors)",
+        lambda: [ESCAPE + "48;2;%d;%d;%dm" % (n & 0xFF, 0, 128) for n in range(N)],
+        lambda: [xterm24bit_bk(((n & 0xFF) << 16) | 128) for n in range(N)],
+    ),
+    (
+        "16 color fg + bk",
+        lambda: [ESCAPE + COLORS_FG[n & 15] + ESCAPE + COLORS_BK[(n >> 4) & 15] for n in range(N)],
+        lambda: [COLORS_FG_BK[n & 15][(n >> 4) & 15] for n in range(N)],
+    ),
+]
+
+
+def main():
+    for name, formatted, table in BENCHMARKS:
+        t_formatted = min(timeit.repeat(formatted, number=1, repeat=3))
+        t_table = min(timeit.repeat(table, number=1, repeat=3))
+        print(
+            f"{name:30s} formatting: {N / t_formatted / 1e6:6.2f} M/s  "
+            f"table: {N / t_table / 1e6:6.2f} M/s  speedup: {t_formatted / t_table:4.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
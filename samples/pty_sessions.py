@@ -0,0 +1,88 @@
+#  Serves many pseudo terminal sessions from one asyncio loop and checks what each console shows.
+#
+#  The master side of every pty is read into a virtual.Emulator, the way an
+#  operator console would display it. Reading is slowed down on purpose for
+#  some sessions, so their output queues up and drain() applies backpressure.
+import asyncio
+import os
+import time
+
+from colorconsole.sessions import SessionManager
+from colorconsole.virtual import Emulator
+
+SESSIONS = 100
+FRAMES = 50
+COLUMNS = 80
+LINES = 24
+
+
+def read_master(master, emulator):
+    try:
+        data = os.read(master, 65536)
+    except OSError:
+        return
+    emulator.feed(data)
+
+
+def read_master_slowly(loop, master, emulator):
+    # Takes 256 bytes, then stops reading for 5 ms
+    try:
+        data = os.read(master, 256)
+    except OSError:
+        return
+    emulator.feed(data)
+    loop.remove_reader(master)
+    loop.call_later(0.005, loop.add_reader, master, read_master_slowly, loop, master, emulator)
+
+
+async def console(session, n):
+    term = session.terminal
+    for frame in range(FRAMES):
+        with term.frame():
+            for line in range(1, LINES):
+                term.set_color(line % 16, 0)
+                term.print_at(1, line, "session %3d frame %3d line %2d" % (n, frame, line))
+            term.reset_colors()
+        await session.drain()
+        await asyncio.sleep(0)
+
+
+async def main():
+    loop = asyncio.get_running_loop()
+    manager = SessionManager(high_water=8 * 1024, low_water=2 * 1024)
+    consoles = []
+    for n in range(SESSIONS):
+        session, master = manager.open_pty(COLUMNS, LINES)
+        os.set_blocking(master, False)
+        emulator = Emulator(COLUMNS, LINES)
+        if n % 10 == 0:
+            loop.add_reader(master, read_master_slowly, loop, master, emulator)
+        else:
+            loop.add_reader(master, read_master, master, emulator)
+        consoles.append((session, master, emulator))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(console(session, n) for n, (session, master, emulator) in enumerate(consoles)))
+    while manager.stats()["buffered"]:
+        await asyncio.sleep(0.01)
+    # Lets the readers take what is still in the pty buffers
+    await asyncio.sleep(0.1)
+    elapsed = time.perf_counter() - start
+
+    stats = manager.stats()
+    errors = 0
+    for n, (session, master, emulator) in enumerate(consoles):
+        expected = "session %3d frame %3d line %2d" % (n, FRAMES - 1, 5)
+        if emulator.rows()[4][: len(expected)] != expected:
+            errors += 1
+        loop.remove_reader(master)
+        os.close(master)
+    manager.close()
+    print(
+        f"{SESSIONS} sessions, {SESSIONS * FRAMES} frames in {elapsed:.2f}s, "
+        f"{stats['bytes_written'] / 1e6:.1f} MB written, {stats['pauses']} pauses, {errors} wrong screens"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
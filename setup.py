@@ -26,7 +26,7 @@ setup(
     author="Nilo Menezes",
     author_email="nilo@nilo.pro.br",
     url="https://github.com/lskbr/colorconsole",
-    packages=["colorconsole"],
+    packages=["colorconsole", "colorconsole.bench"],
     license="LGPL",
     scripts=[],
     long_description="""colorconsole uses a common set of console (text mode) primitives, \
@@ -0,0 +1,30 @@
+from colorconsole.ansi_parser import AnsiParser, strip, visible_length
+
+
+def test_strip():
+    assert strip("\x1b[1;31mred\x1b[0m \x1b]2;title\x07x") == "red x"
+    assert strip(b"\x1b[1;31mred\x1b[0m") == b"red"
+
+
+def test_visible_length_counts_cells():
+    text = "\x1b[31m漢字\x1b[0m é\t"
+    assert visible_length(text) == 6
+    assert visible_length(text.encode("utf-8")) == 6
+
+
+def test_ascii_controls_take_no_cells():
+    text = "\x1b[32mok\x1b[0m\tline\r\n\x07\x7fend\n" * 3
+    assert visible_length(text) == 27
+    assert visible_length(text.encode("ascii")) == 27
+    assert AnsiParser().visible_length(text) == 27
+
+
+def test_streamed_chunks():
+    data = "\x1b[31m漢字\x1b[0m é ok".encode("utf-8")
+    for size in range(1, 8):
+        parser = AnsiParser()
+        total = sum(parser.visible_length(data[i : i + size]) for i in range(0, len(data), size))
+        assert total == 9, size
+        parser = AnsiParser()
+        text = b"".join(parser.strip(data[i : i + size]) for i in range(0, len(data), size))
+        assert text == "漢字 é ok".encode("utf-8"), size
@@ -0,0 +1,98 @@
+# cprint_many, print_rows and xterm24bit_runs must leave the same cells and
+# terminal state as the equivalent loops of single calls.
+
+import random
+
+import pytest
+
+from colorconsole.sgr import color_24bit
+from colorconsole.virtual import Terminal
+
+DEPTHS = [24, 8, 4, 0]
+
+
+def segments(seed, count=200):
+    rng = random.Random(seed)
+    colors = [None, 2, 12, 4, 15]
+    return [(rng.choice(colors), rng.choice(colors), rng.choice(["ab", "", "c", "漢"])) for _ in range(count)]
+
+
+def same(bulk, loop):
+    assert bulk.emulator.cells == loop.emulator.cells
+    assert (bulk.fg, bulk.bk, bulk.attrs) == (loop.fg, loop.bk, loop.attrs)
+
+
+@pytest.mark.parametrize("depth", DEPTHS)
+def test_cprint_many_matches_cprint_loop(depth):
+    for seed in range(3):
+        bulk, loop = Terminal(40, 12, color_depth=depth), Terminal(40, 12, color_depth=depth)
+        for term in (bulk, loop):
+            term.xterm24bit_set_bk_color(1, 2, 3)
+            term.underline()
+        items = segments(seed)
+        bulk.cprint_many(items)
+        for fg, bk, text in items:
+            loop.cprint(fg, bk, text)
+        same(bulk, loop)
+        # The tracked state is the one on screen
+        for term in (bulk, loop):
+            term.print("x")
+        same(bulk, loop)
+
+
+@pytest.mark.parametrize("depth", DEPTHS)
+def test_print_rows_matches_print_at_loop(depth):
+    rows = ["plain row", segments(1, 8), "", segments(2, 5)]
+    bulk, loop = Terminal(40, 6, color_depth=depth), Terminal(40, 6, color_depth=depth)
+    bulk.print_rows(rows, 3, 2)
+    for y, row in enumerate(rows, 2):
+        loop.gotoXY(3, y)
+        if isinstance(row, str):
+            loop.print(row)
+        else:
+            for fg, bk, text in row:
+                loop.cprint(fg, bk, text)
+    same(bulk, loop)
+
+
+def colors(count):
+    rng = random.Random(count)
+    return [rng.choice([0x102030, 0xFF8000, 0x00FF00]) for _ in range(count)]
+
+
+@pytest.mark.parametrize("depth", DEPTHS)
+@pytest.mark.parametrize("foreground", [False, True])
+def test_xterm24bit_runs_matches_setter_loop(depth, foreground):
+    values = colors(60)
+    text = "".join(chr(ord("a") + n % 26) for n in range(len(values)))
+    for chars in (" ", text):
+        bulk, loop = Terminal(30, 4, color_depth=depth), Terminal(30, 4, color_depth=depth)
+        for term in (bulk, loop):
+            term.set_color(2, 4)
+        bulk.xterm24bit_runs(values, chars, foreground)
+        for n, color in enumerate(values):
+            rgb = (color >> 16, (color >> 8) & 0xFF, color & 0xFF)
+            if foreground:
+                loop.xterm24bit_set_fg_color(*rgb)
+            else:
+                loop.xterm24bit_set_bk_color(*rgb)
+            loop.print(chars if len(chars) == 1 else chars[n])
+        same(bulk, loop)
+
+
+def test_xterm24bit_runs_numpy_input():
+    np = pytest.importorskip("numpy")
+    values = colors(40)
+    rgb = np.array([(c >> 16, (c >> 8) & 0xFF, c & 0xFF) for c in values], dtype=np.uint8)
+    expected = Terminal(20, 4)
+    expected.xterm24bit_runs(values)
+    for array in (rgb, np.array(values, dtype=np.uint32)):
+        term = Terminal(20, 4)
+        term.xterm24bit_runs(array)
+        same(term, expected)
+    assert term.emulator.cell(0, 0)[2] == color_24bit(*rgb[0].tolist())
+
+
+def test_xterm24bit_runs_text_length():
+    with pytest.raises(ValueError):
+        Terminal().xterm24bit_runs([1, 2, 3], "ab")
@@ -0,0 +1,123 @@
+import pytest
+
+from colorconsole.cells import CLUSTER, CONTINUATION, CellBuffer
+from colorconsole.screen import Screen
+from colorconsole.sgr import color_24bit
+from colorconsole.virtual import Terminal
+
+
+def test_cells_round_trip():
+    buffer = CellBuffer(4, 2)
+    tables = buffer.tables
+    buffer.chars[0] = tables.code("漢")
+    buffer.chars[1] = tables.code("")
+    buffer.chars[2] = tables.code("e\u0301")
+    buffer.styles[0] = buffer.styles[1] = tables.style_id((1, 2, 8))
+    assert buffer.chars[1] == CONTINUATION and buffer.chars[2] >= CLUSTER
+    assert buffer.row(0) == [("漢", 1, 2, 8), ("", 1, 2, 8), ("e\u0301", None, None, 0), (" ", None, None, 0)]
+    assert buffer.cell(0, 1) == (" ", None, None, 0)
+
+
+def test_copies_are_independent_and_share_tables():
+    buffer = CellBuffer(3, 2)
+    copy = buffer.copy()
+    assert copy.tables is buffer.tables
+    assert all(copy.row_equal(y, buffer) for y in range(2))
+    buffer.chars[4] = ord("x")
+    assert copy.row_equal(0, buffer) and not copy.row_equal(1, buffer)
+    assert copy.cell(1, 1)[0] == " "
+
+
+def test_resized_keeps_cells():
+    buffer = CellBuffer(3, 2)
+    buffer.chars[0] = ord("a")
+    buffer.chars[5] = ord("b")
+    bigger = buffer.resized(4, 3, (None, 4, 0))
+    assert [row[0][0] for row in bigger.rows()] == ["a", " ", " "]
+    assert bigger.cell(2, 1)[0] == "b"
+    assert bigger.cell(3, 0) == (" ", None, 4, 0)
+    assert buffer.resized(2, 1).rows() == [[("a", None, None, 0), (" ", None, None, 0)]]
+
+
+def test_memory_per_cell():
+    buffer = CellBuffer(400, 120)
+    assert buffer.nbytes() <= 400 * 120 * 8 + 120
+
+
+def test_clean_lines_are_skipped():
+    term = Terminal(20, 5)
+    screen = Screen(term)
+    screen.print_at(0, 1, "hello")
+    screen.flush()
+    assert not any(screen.buffer.dirty)
+    screen.print_at(0, 1, "hello")
+    assert list(screen.buffer.dirty) == [0, 1, 0, 0, 0]
+    assert screen.render(term.sgr) == ""
+
+
+def test_snapshot_and_restore():
+    term = Terminal(20, 5)
+    screen = Screen(term)
+    screen.print_at(0, 0, "first 漢字")
+    screen.flush()
+    snapshot = screen.snapshot()
+    screen.clear()
+    screen.print_at(2, 2, "second")
+    screen.flush()
+    screen.restore(snapshot)
+    screen.flush()
+    assert term.text().splitlines()[0] == "first 漢字"
+    assert "second" not in term.text()
+    # A snapshot of another screen
+    other = Screen(term)
+    other.restore(snapshot)
+    other.print_at(0, 1, "other")
+    other.flush()
+    assert term.text().splitlines()[:2] == ["first 漢字", "other"]
+
+
+def test_rebased_keeps_cells():
+    buffer = CellBuffer(4, 1)
+    buffer.chars[0] = buffer.tables.code("e\u0301")
+    buffer.styles[1] = buffer.tables.style_id((1, 2, 8))
+    other = buffer.rebased(CellBuffer(1, 1).tables)
+    assert other.tables is not buffer.tables
+    assert other.rows() == buffer.rows()
+
+
+def animate(screen, frame):
+    # 480 new styles per frame on 80 x 24
+    for y in range(screen.lines()):
+        for x in range(0, screen.columns(), 4):
+            screen.bk = color_24bit(frame % 256, y * 10, x)
+            screen.print_at(x, y, "%4d" % frame)
+    screen.flush()
+
+
+def test_tables_stay_bounded():
+    term = Terminal(80, 24)
+    screen = Screen(term)
+    sizes = []
+    for frame in range(200):
+        animate(screen, frame)
+        if frame == 5:
+            snapshot = screen.snapshot()
+            expected = snapshot.rows()
+        sizes.append(len(screen.buffer.tables))
+    assert max(sizes) <= screen.buffer.compact_limit() + 480
+    assert screen.buffer.tables is not snapshot.tables
+    assert term.emulator.cells == screen.cells
+    # A snapshot taken before the tables were compacted
+    screen.restore(snapshot)
+    screen.flush()
+    assert screen.cells == expected
+    assert term.emulator.cells == expected
+
+
+def test_as_numpy():
+    np = pytest.importorskip("numpy")
+    buffer = CellBuffer(3, 2)
+    chars, styles = buffer.as_numpy()
+    chars[1, 2] = ord("z")
+    assert chars.shape == (2, 3) and styles.dtype == np.uint32
+    assert buffer.cell(2, 1)[0] == "z"
@@ -0,0 +1,50 @@
+# Cursor moves planned inside frames must land where ESC[y;xH would.
+
+import random
+
+from colorconsole.cursor import move_cursor
+from colorconsole.virtual import Emulator, Terminal
+
+
+def test_moves_reach_target():
+    rng = random.Random(4)
+    for _ in range(3000):
+        current = (rng.randint(1, 20), rng.randint(1, 8))
+        target = (rng.randint(1, 20), rng.randint(1, 8))
+        emulator = Emulator(20, 8)
+        emulator.feed("%s\x1b[%d;%dH" % ("abcdefghijklmnopqrst" * 8, current[1], current[0]))
+        before = emulator.rows()
+        emulator.feed(move_cursor(current, target, "x" * max(0, target[0] - current[0])))
+        assert (emulator.x + 1, emulator.y + 1) == target, (current, target)
+        if target[1] != current[1]:
+            assert emulator.rows() == before
+
+
+def draw(term, rng, framed):
+    if framed:
+        term.begin_frame()
+    for _ in range(200):
+        x, y = rng.randint(0, 25), rng.randint(0, 12)
+        term.gotoXY(x, y)
+        term.print("%d,%d" % (x, y))
+    if framed:
+        term.end_frame()
+
+
+def test_framed_output_matches_unframed():
+    for seed in range(10):
+        framed, unframed = Terminal(20, 10), Terminal(20, 10)
+        draw(framed, random.Random(seed), True)
+        draw(unframed, random.Random(seed), False)
+        assert framed.emulator.rows() == unframed.emulator.rows(), seed
+
+
+def test_goto_past_the_last_line_does_not_scroll():
+    term = Terminal(10, 5)
+    term.print_at(1, 1, "top")
+    with term.frame():
+        term.gotoXY(1, 4)
+        term.gotoXY(1, 6)
+        term.print("x")
+    assert term.emulator.rows()[0].startswith("top")
+    assert term.emulator.rows()[4].startswith("x")
@@ -0,0 +1,53 @@
+import pytest
+
+from colorconsole.quantize import rgb_to_16, rgb_to_256
+from colorconsole.sgr import COLOR_24BIT, COLOR_256
+from colorconsole.virtual import Terminal
+
+np = pytest.importorskip("numpy")
+
+
+def image():
+    rng = np.random.default_rng(1)
+    return rng.integers(0, 256, (7, 9, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("depth", [24, 8, 4])
+def test_pixels_in_terminal_colors(depth):
+    pixels = image()
+    term = Terminal(20, 6, color_depth=depth)
+    term.set_color(2, 4)
+    term.underline()
+    term.draw_image(pixels, 3, 2)
+    padded = np.concatenate([pixels, np.zeros((1, 9, 3), dtype=np.uint8)])
+    for row in range(4):
+        for column in range(9):
+            colors = []
+            for r, g, b in (padded[2 * row, column].tolist(), padded[2 * row + 1, column].tolist()):
+                if depth == 24:
+                    colors.append(COLOR_24BIT | (r << 16) | (g << 8) | b)
+                elif depth == 8:
+                    colors.append(COLOR_256 | rgb_to_256(r, g, b))
+                else:
+                    colors.append(rgb_to_16(r, g, b))
+            ch, fg, bk, attrs = term.emulator.cell(2 + column, 1 + row)
+            assert (ch, fg, bk) == ("▀", colors[0], colors[1]), (depth, row, column)
+    # The caller's style is selected again
+    term.print_at(1, 6, "x")
+    assert term.emulator.cell(0, 5)[1:] == (2, 4, 8)
+
+
+
+@pytest.mark.parametrize("depth", [24, 8])
+def test_image_is_clipped_to_the_screen(depth):
+    pixels = np.full((40, 30, 3), 200, dtype=np.uint8)
+    term = Terminal(20, 10, color_depth=depth)
+    term.print_at(1, 1, "top")
+    term.draw_image(pixels, 5, 3)
+    rows = ["".join(cell[0] for cell in row) for row in term.emulator.cells]
+    assert rows == ["top" + " " * 17, " " * 20] + [" " * 4 + "▀" * 16] * 8
+    # Partly above and left of the screen
+    term = Terminal(20, 10, color_depth=depth)
+    term.draw_image(pixels, -2, 0)
+    rows = ["".join(cell[0] for cell in row) for row in term.emulator.cells]
+    assert rows == ["▀" * 20] * 10
@@ -0,0 +1,79 @@
+# The key decoder must give the same keys however the input is split.
+
+import os
+import time
+
+import pytest
+
+from colorconsole.keys import ALT, CTRL, KeyDecoder, KeyInput
+from colorconsole.virtual import Terminal
+
+INPUT = (
+    b"hi "
+    + b"\x1b[A\x1b[1;5C\x1b[15~\x1bOP\x1bx"
+    + "ação 漢".encode("utf-8")
+    + b"\x1b[200~pasted \x1b[A text\x1b[201~"
+    + b"\x01\x7f\r"
+)
+
+
+def decode(data, size):
+    decoder = KeyDecoder()
+    keys = []
+    for start in range(0, len(data), size):
+        keys += decoder.feed(data[start : start + size])
+    return keys + decoder.flush()
+
+
+def test_keys():
+    keys = decode(INPUT, len(INPUT))
+    assert [key.name for key in keys[:3]] == ["h", "i", " "]
+    assert (keys[3].name, keys[4].name, keys[4].modifiers) == ("UP", "RIGHT", CTRL)
+    assert keys[7] == ("x", ALT, "\x1bx")
+    assert "".join(key.name for key in keys[8:14]) == "ação 漢"
+    assert keys[14] == ("PASTE", 0, "pasted \x1b[A text")
+
+
+def test_any_split_gives_the_same_keys():
+    expected = decode(INPUT, len(INPUT))
+    for size in range(1, 12):
+        assert decode(INPUT, size) == expected, size
+
+
+def test_large_paste_is_linear():
+    def paste_time(size):
+        data = b"\x1b[200~" + b"x" * size + b"\x1b[201~"
+        started = time.perf_counter()
+        keys = decode(data, 4096)
+        assert len(keys) == 1 and len(keys[0].data) == size
+        return time.perf_counter() - started
+
+    small, large = paste_time(1 << 20), paste_time(8 << 20)
+    assert large < small * 8 * 4
+
+
+def test_end_of_file_keeps_the_stdin_contract():
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"ab\x1b")
+    os.close(write_fd)
+    try:
+        keys = KeyInput(read_fd, escape_timeout=0)
+        assert keys.getch() == "a"
+        assert keys.read_key(0).name == "b"
+        assert keys.read_key(0).name == "ESCAPE"
+        # As select() and sys.stdin.read(1) at the end of a file
+        assert keys.kbhit()
+        assert keys.getch() == ""
+        assert keys.getch() == ""
+        with pytest.raises(EOFError):
+            keys.read_key()
+    finally:
+        os.close(read_fd)
+
+
+def test_virtual_end_of_input():
+    term = Terminal()
+    term.feed_input("x")
+    assert term.getch() == "x"
+    assert term.kbhit(0) is False
+    assert term.getch() == ""
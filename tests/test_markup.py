@@ -0,0 +1,74 @@
+# Style markup checked on a virtual terminal: the cells must have the styles
+# the tags select.
+
+import pytest
+
+from colorconsole.markup import compile_markup, parse_style, render
+from colorconsole.quantize import rgb_to_16, rgb_to_256
+from colorconsole.sgr import BOLD, UNDERLINE, color_24bit, color_256
+from colorconsole.virtual import Terminal
+
+
+def styles(term, count):
+    return [term.emulator.cell(x, 0) for x in range(count)]
+
+
+def test_parse_style():
+    assert parse_style("bold red on blue", (None, None, 0)) == (4, 1, BOLD)
+    assert parse_style("color(200) on #010203", (None, None, UNDERLINE)) == (
+        color_256(200),
+        color_24bit(1, 2, 3),
+        UNDERLINE,
+    )
+    assert parse_style("notbold default", (4, 1, BOLD)) == (None, 1, 0)
+    with pytest.raises(ValueError):
+        parse_style("bold info", (None, None, 0))
+
+
+def test_nested_tags():
+    term = Terminal(20, 2)
+    term.set_color(2)
+    term.render("a[red]b[underline on blue]c[/]d[/]e[/]f")
+    assert styles(term, 6) == [
+        ("a", 2, None, 0),
+        ("b", 4, None, 0),
+        ("c", 4, 1, UNDERLINE),
+        ("d", 4, None, 0),
+        ("e", 2, None, 0),
+        ("f", 2, None, 0),
+    ]
+    assert (term.fg, term.bk, term.attrs) == (2, None, 0)
+
+
+def test_brackets_that_are_not_styles_are_text():
+    assert render("[INFO] {}", "started") == "[INFO] started"
+    assert render("[{}] [] [[bold]] [red on]", 3) == "[3] [] [bold]] [red on]"
+    term = Terminal(30, 2)
+    term.render("[WARN] [bold]{}[/]", "disk")
+    assert term.emulator.rows()[0].rstrip() == "[WARN] disk"
+    assert term.emulator.cell(7, 0) == ("d", None, None, BOLD)
+
+
+@pytest.mark.parametrize("depth", [24, 8, 4, 0])
+def test_colors_are_degraded(depth):
+    term = Terminal(10, 2, color_depth=depth)
+    term.render("[#ff8000]x")
+    expected = {
+        24: color_24bit(255, 128, 0),
+        8: color_256(rgb_to_256(255, 128, 0)),
+        4: rgb_to_16(255, 128, 0),
+        0: None,
+    }[depth]
+    assert term.emulator.cell(0, 0)[1] == expected
+    if depth == 0:
+        assert compile_markup("[#ff8000]x[/]", color_depth=0) == ("x",)
+
+
+def test_cache_key_has_base_style_and_depth():
+    compile_markup.cache_clear()
+    plain = compile_markup("[red]x")
+    assert compile_markup("[red]x") is plain
+    assert compile_markup("[red]x", (2, None, 0)) != plain
+    assert compile_markup("[red]x", color_depth=0) == ("x",)
+    info = compile_markup.cache_info()
+    assert (info.hits, info.misses) == (1, 3)
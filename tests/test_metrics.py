@@ -0,0 +1,28 @@
+from colorconsole.metrics import sequence_names
+from colorconsole.virtual import Terminal
+
+
+def test_sequence_names():
+    text = "\x1b[2J\x1b[J\x1b[0J\x1b[3;4H\x1b[1;31m\x1b[38;5;3m\x1b[48;2;1;2;3m\x1b[K\x1b]2;t\x07"
+    assert sequence_names(text) == [
+        "clear",
+        "clear_eos",
+        "clear_eos",
+        "gotoxy",
+        "sgr",
+        "xterm256",
+        "xterm24bit",
+        "clear_eol",
+        "title",
+    ]
+
+
+def test_terminal_counts_sequences():
+    term = Terminal(20, 5)
+    term.enable_metrics()
+    term.clear()
+    term.gotoXY(2, 2)
+    term.clear_eos()
+    term.clear_eos()
+    sequences = term.stats()["sequences"]
+    assert (sequences["clear"], sequences["clear_eos"]) == (1, 2)
@@ -0,0 +1,93 @@
+# OutputQueue on a virtual terminal: merged commands, dropped ones and a
+# single terminal write per batch.
+
+import threading
+
+from colorconsole.output_queue import OutputQueue
+from colorconsole.sgr import BOLD, UNDERLINE
+from colorconsole.virtual import Terminal
+
+
+class CountingTerminal(Terminal):
+    writes = 0
+
+    def _send(self, text):
+        self.writes += 1
+        super()._send(text)
+
+    def _write_frame(self, text):
+        self.writes += 1
+        super()._write_frame(text)
+
+
+def row(term, y):
+    return "".join(cell[0] for cell in term.emulator.cells[y - 1]).rstrip()
+
+
+def test_covered_commands_are_merged():
+    term = Terminal(20, 5)
+    out = OutputQueue(term)
+    out.print_at(1, 1, "10%")
+    out.print_at(1, 1, "20%")
+    out.print_at(1, 1, "30%", fg=12, attrs=UNDERLINE)
+    out.print_at(1, 2, "long text")
+    out.print_at(1, 2, "short")
+    with out:
+        pass
+    assert row(term, 1) == "30%"
+    assert row(term, 2) == "shorttext"
+    assert term.emulator.cell(0, 0) == ("3", 12, None, BOLD | UNDERLINE)
+    stats = out.stats()
+    assert (stats["submitted"], stats["merged"], stats["written"]) == (5, 2, 3)
+
+
+def test_styles_are_selected_as_set_style_does():
+    term = Terminal(20, 5)
+    with OutputQueue(term) as out:
+        out.print_at(1, 1, "x", fg=12, bk=4, attrs=UNDERLINE)
+    assert (term.fg, term.bk, term.attrs) == (12, 4, BOLD | UNDERLINE)
+
+
+def test_commands_past_maxsize_are_dropped():
+    term = Terminal(20, 5)
+    out = OutputQueue(term, maxsize=3)
+    results = [out.print_at(1, y, "x") for y in range(1, 6)]
+    assert results == [True, True, True, False, False]
+    assert out.stats()["dropped"] == 2
+    out.start()
+    out.stop()
+    assert [row(term, y) for y in range(1, 6)] == ["x", "x", "x", "", ""]
+    assert out.print_at(1, 4, "y")
+
+
+def test_join_and_stop_write_everything():
+    term = Terminal(40, 10)
+    out = OutputQueue(term).start()
+
+    def worker(y):
+        for n in range(100):
+            out.print_at(1, y, "line %d: %d" % (y, n))
+
+    threads = [threading.Thread(target=worker, args=(y,)) for y in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert out.join(5)
+    assert [row(term, y) for y in range(1, 9)] == ["line %d: 99" % y for y in range(1, 9)]
+    out.print_at(1, 10, "last")
+    out.stop()
+    assert row(term, 10) == "last"
+    assert out.depth() == 0
+
+
+def test_one_write_per_batch():
+    term = CountingTerminal(40, 10)
+    out = OutputQueue(term)
+    for n in range(200):
+        out.print_at(n % 40 + 1, n % 10 + 1, "x", fg=n % 16, bk=n % 8)
+    term.writes = 0
+    out.start()
+    out.stop()
+    assert out.stats()["batches"] == 1
+    assert term.writes == 1
@@ -0,0 +1,65 @@
+# Scroll regions and log panes: output written inside frames must show the
+# same screen as the same calls made one by one.
+
+import random
+
+from colorconsole.pane import LogPane
+from colorconsole.virtual import Terminal
+
+
+def test_move_below_region_inside_frame():
+    screens = []
+    for framed in (False, True):
+        term = Terminal(10, 6)
+        for line in range(1, 7):
+            term.print_at(1, line, "line %d" % line)
+        if framed:
+            term.begin_frame()
+        term.set_scroll_region(1, 4)
+        term.gotoXY(1, 4)
+        term.print("four")
+        term.gotoXY(1, 5)
+        term.print("five")
+        term.reset_scroll_region()
+        if framed:
+            term.end_frame()
+        screens.append(term.emulator.rows())
+    assert screens[0] == screens[1]
+    assert screens[1][0].startswith("line 1")
+
+
+def test_pane_matches_its_lines():
+    rng = random.Random(3)
+    term = Terminal(30, 12)
+    term.print_at(1, 1, "header")
+    term.print_at(1, 12, "footer")
+    pane = LogPane(term, 3, 9)
+    for n in range(300):
+        op = rng.random()
+        if op < 0.6:
+            pane.append("append %d" % n, fg=rng.choice([None, 2, 12]))
+        elif op < 0.75:
+            pane.insert(rng.randrange(pane.height), "insert %d" % n)
+        elif op < 0.85:
+            pane.delete(rng.randrange(pane.height))
+        else:
+            pane.replace(rng.randrange(pane.height), "replace %d" % n)
+        rows = term.emulator.rows()
+        assert rows[0].startswith("header") and rows[11].startswith("footer")
+        for index in range(pane.height):
+            text = pane.lines[index][0] if index < len(pane.lines) else ""
+            assert rows[2 + index].rstrip() == text, (n, index)
+
+
+def test_pane_keeps_the_caller_style():
+    term = Terminal(20, 8)
+    pane = LogPane(term, 2, 4)
+    term.set_color(2, 4)
+    for n in range(6):
+        pane.append("line %d" % n, fg=12)
+    pane.insert(0, "first")
+    pane.delete(1)
+    pane.redraw()
+    assert (term.fg, term.bk, term.attrs) == (2, 4, 0)
+    term.print_at(1, 8, "x")
+    assert term.emulator.cell(0, 7) == ("x", 2, 4, 0)
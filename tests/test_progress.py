@@ -0,0 +1,30 @@
+from colorconsole.progress import Progress
+from colorconsole.virtual import Terminal
+
+
+def test_bars_below_the_last_line_are_not_drawn():
+    term = Terminal(40, 6)
+    term.print_at(1, 1, "title")
+    progress = Progress(term, top=2)
+    bars = [progress.add(10, "bar %d" % i) for i in range(10)]
+    for _ in range(5):
+        for bar in bars:
+            bar.update()
+        progress.render()
+    rows = term.emulator.rows()
+    assert rows[0].startswith("title")
+    assert [row.split(" [")[0] for row in rows[1:]] == ["bar %d" % i for i in range(5)]
+
+
+def test_render_keeps_the_caller_style():
+    term = Terminal(40, 6)
+    term.set_color(2, 4)
+    term.underline()
+    progress = Progress(term, top=2)
+    progress.add(10, "plain").update()
+    progress.add(10, "bright", fg=12).update()
+    assert progress.render() == 2
+    assert term.emulator.cell(0, 1)[1:] == (None, None, 0)
+    assert term.emulator.cell(0, 2)[1:] == (12, None, 1)
+    term.print_at(1, 1, "x")
+    assert term.emulator.cell(0, 0) == ("x", 2, 4, 8)
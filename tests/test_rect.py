@@ -0,0 +1,61 @@
+# fill_rect and clear_rect compared with writing every cell, with and without
+# the ECH/REP/BCE capabilities.
+
+import random
+
+from colorconsole.virtual import Terminal
+
+
+def naive_fill(emulator_rows, x, y, width, height, ch, columns, lines):
+    for line in range(y, min(y + height, lines + 1)):
+        row = emulator_rows[line - 1]
+        for column in range(x, min(x + width, columns + 1)):
+            row[column - 1] = ch
+
+
+def make_terminal(capable):
+    term = Terminal(30, 10)
+    if not capable:
+        term.caps = term.caps._replace(erase_chars=False, repeat=False, bce=False)
+    for line in range(1, 11):
+        term.print_at(1, line, "%02d" % line + "abcdefghijklmnopqrstuvwxyz01")
+    return term
+
+
+def test_fill_rect_matches_cells():
+    rng = random.Random(2)
+    for capable in (True, False):
+        for _ in range(200):
+            term = make_terminal(capable)
+            expected = [list(row) for row in term.emulator.rows()]
+            x, y = rng.randint(1, 30), rng.randint(1, 10)
+            width, height = rng.randint(0, 40), rng.randint(0, 14)
+            ch = rng.choice(" #")
+            term.fill_rect(x, y, width, height, ch)
+            naive_fill(expected, x, y, width, height, ch, 30, 10)
+            assert term.emulator.rows() == ["".join(row) for row in expected], (capable, x, y, width, height, ch)
+
+
+def test_fill_rect_keeps_style():
+    term = make_terminal(True)
+    term.set_color(3, 1)
+    term.fill_rect(2, 2, 5, 3, "*", fg=12, bk=4)
+    assert (term.fg, term.bk, term.attrs) == (3, 1, 0)
+    assert term.emulator.cell(1, 1) == ("*", 12, 4, 1)
+
+
+class CapturingTerminal(Terminal):
+    def _write_frame(self, text):
+        self.output += text
+        super()._write_frame(text)
+
+
+def test_rect_is_clipped_to_the_screen():
+    outputs = []
+    for height in (2, 4):
+        term = CapturingTerminal(30, 10)
+        term.output = ""
+        with term.frame():
+            term.fill_rect(1, 9, 5, height, "#")
+        outputs.append(term.output)
+    assert outputs[0] == outputs[1]
@@ -0,0 +1,73 @@
+# Both FrameScheduler drivers: invalidations are merged into at most one
+# frame per interval and stop() renders a pending frame.
+
+import asyncio
+import threading
+import time
+
+from colorconsole.scheduler import FrameScheduler
+
+
+class Recorder:
+    def __init__(self):
+        self.times = []
+
+    def __call__(self):
+        self.times.append(time.monotonic())
+
+
+def test_invalidations_are_coalesced():
+    render = Recorder()
+    scheduler = FrameScheduler(render, fps=20).start()
+    started = time.monotonic()
+    while time.monotonic() - started < 0.3:
+        scheduler.invalidate()
+        time.sleep(0.0005)
+    elapsed = time.monotonic() - started
+    scheduler.stop()
+    assert scheduler.invalidations > 100
+    assert 2 <= len(render.times) <= elapsed * 20 + 2
+    gaps = [b - a for a, b in zip(render.times, render.times[1:])]
+    assert min(gaps) >= 0.05 * 0.9
+    assert scheduler.stats()["skipped"] == scheduler.invalidations - len(render.times)
+
+
+def test_stop_renders_the_pending_frame():
+    render = Recorder()
+    scheduler = FrameScheduler(render, fps=1).start()
+    scheduler.invalidate()
+    deadline = time.monotonic() + 1
+    while not render.times and time.monotonic() < deadline:
+        time.sleep(0.001)
+    # Due in a second: stop() must not wait for it
+    scheduler.invalidate()
+    started = time.monotonic()
+    scheduler.stop()
+    assert time.monotonic() - started < 0.5
+    assert len(render.times) == 2
+
+
+def test_nothing_is_rendered_without_invalidate():
+    render = Recorder()
+    with FrameScheduler(render, fps=100):
+        time.sleep(0.05)
+    assert render.times == []
+
+
+def test_asyncio_driver():
+    render = Recorder()
+    scheduler = FrameScheduler(render, fps=1)
+
+    async def main():
+        task = asyncio.create_task(scheduler.run())
+        scheduler.invalidate()
+        await asyncio.sleep(0.05)
+        assert len(render.times) == 1
+        # Pending until the next interval, rendered by stop() from another thread
+        scheduler.invalidate()
+        scheduler.invalidate()
+        threading.Thread(target=scheduler.stop).start()
+        await asyncio.wait_for(task, 0.5)
+
+    asyncio.run(main())
+    assert len(render.times) == 2
@@ -0,0 +1,94 @@
+# Screen.flush checked against what a terminal shows: after every flush the
+# virtual.Emulator must hold the cells of the Screen.
+
+import random
+
+from colorconsole.screen import Screen
+from colorconsole.sgr import BOLD, UNDERLINE, color_24bit, color_256, degrade
+from colorconsole.virtual import Terminal
+
+COLORS = [None, 3, 12, color_256(200), color_24bit(9, 8, 7)]
+TEXTS = ["ab", "漢", "xyz", "漢字", "é", "e\u0301", "long line " * 3, "a\nb", "a\tb", "x\x1b[31my", "é\x07\x9b"]
+
+
+def shown(cell, depth=24):
+    # The cell as the emulator reports it: degraded colors, bright colors are bold ones
+    ch, fg, bk, attrs = cell
+    fg, bk = degrade(fg, depth), degrade(bk, depth)
+    if fg is not None and fg < 16 and (fg >= 8 or attrs & BOLD):
+        fg |= 8
+        attrs |= BOLD
+    return ch, fg, bk, attrs
+
+
+def draw(screen, rng, count):
+    for _ in range(count):
+        op = rng.random()
+        if op < 0.02:
+            screen.clear()
+            continue
+        screen.fg = rng.choice(COLORS)
+        screen.bk = rng.choice(COLORS)
+        screen.attrs = rng.choice([0, BOLD, UNDERLINE])
+        screen.print_at(rng.randrange(screen.columns()), rng.randrange(screen.lines()), rng.choice(TEXTS))
+
+
+def check(term, screen, depth=24):
+    expected = [[shown(cell, depth) for cell in row] for row in screen.cells]
+    assert term.emulator.cells == expected
+
+
+def test_flush_matches_emulator():
+    for depth in (24, 8, 4):
+        rng = random.Random(depth)
+        term = Terminal(30, 8, color_depth=depth)
+        screen = Screen(term)
+        for frame in range(40):
+            draw(screen, rng, rng.randrange(30))
+            if frame % 9 == 0:
+                # Terminal output between frames
+                term.set_color(rng.randrange(16), rng.randrange(8))
+            screen.flush()
+            check(term, screen, depth)
+
+
+def test_invalidate_repaints_everything():
+    term = Terminal(20, 5)
+    screen = Screen(term)
+    draw(screen, random.Random(1), 20)
+    screen.flush()
+    term.emulator.feed("\x1b[2Jgarbage")
+    screen.invalidate()
+    screen.flush()
+    check(term, screen)
+
+
+def test_unchanged_screen_writes_nothing():
+    term = Terminal(20, 5)
+    screen = Screen(term)
+    screen.print_at(2, 2, "hello")
+    assert screen.flush()
+    screen.print_at(2, 2, "hello")
+    assert screen.flush() == 0
+
+
+def test_flush_leaves_terminal_style():
+    term = Terminal(20, 5)
+    term.set_color(2, 4)
+    screen = Screen(term)
+    screen.fg = 12
+    screen.print_at(0, 0, "x")
+    screen.flush()
+    term.print_at(1, 5, "y")
+    assert term.emulator.cell(0, 4) == ("y", 2, 4, 0)
+
+
+def test_control_characters_are_not_stored():
+    term = Terminal(20, 5)
+    screen = Screen(term)
+    screen.print_at(0, 0, "a\tb\x1b[31mc")
+    screen.print_at(0, 1, "é\x07\u0301\x9bf")
+    assert [cell[0] for cell in screen.cells[0][:4]] == ["a", "b", "[", "3"]
+    assert [cell[0] for cell in screen.cells[1][:3]] == ["é\u0301", "f", " "]
+    screen.flush()
+    check(term, screen)
@@ -0,0 +1,38 @@
+import asyncio
+import socket
+
+from colorconsole.capabilities import remote
+from colorconsole.sessions import SessionManager
+
+
+def session_output(**kwargs):
+    async def main():
+        server, client = socket.socketpair()
+        manager = SessionManager()
+        session = manager.open(server.fileno(), **kwargs)
+        session.terminal.set_color(4)
+        session.terminal.print("red")
+        await session.drain()
+        data = client.recv(4096)
+        depth = session.terminal.color_depth
+        manager.close()
+        server.close()
+        client.close()
+        return data, depth
+
+    return asyncio.run(main())
+
+
+def test_socket_session_uses_the_client_term():
+    data, depth = session_output(term="xterm-256color")
+    assert depth == 8
+    assert data == b"\x1b[0;31mred"
+
+
+def test_color_depth_override():
+    assert session_output(term="xterm", color_depth=24)[1] == 24
+    assert session_output(caps=remote(-1, "xterm", 4))[1] == 4
+
+
+def test_socket_session_without_term_has_no_colors():
+    assert session_output() == (b"red", 0)
@@ -0,0 +1,61 @@
+# SGR sequences checked against the virtual.Emulator: after any transition,
+# the terminal must show exactly the tracked style.
+
+import random
+
+from colorconsole.sgr import (
+    BOLD,
+    CROSSED,
+    DIM,
+    ITALIC,
+    REVERSE,
+    UNDERLINE,
+    color_24bit,
+    color_256,
+    sgr_sequence,
+    sgr_transition,
+)
+from colorconsole.virtual import Emulator
+
+COLORS = [None] + list(range(16)) + [color_256(n) for n in (16, 100, 231, 255)] + [color_24bit(1, 2, 3)]
+ATTRIBUTES = [0, BOLD, DIM, ITALIC, UNDERLINE, REVERSE, CROSSED, UNDERLINE | REVERSE, BOLD | ITALIC]
+
+
+def shown(style):
+    # Style of a cell as the emulator reports it: bright colors are bold ones
+    fg, bk, attrs = style
+    if fg is not None and fg < 16 and (fg >= 8 or attrs & BOLD):
+        fg |= 8
+        attrs |= BOLD
+    return fg, bk, attrs
+
+
+def cell_after(*sequences):
+    emulator = Emulator(4, 1)
+    emulator.feed("".join(sequences) + "\x1b[Hx")
+    return emulator.cell(0, 0)[1:]
+
+
+def test_sequence_selects_style():
+    for fg in COLORS:
+        for bk in COLORS:
+            for attrs in ATTRIBUTES:
+                assert cell_after("\x1b[4;7;3m", sgr_sequence(fg, bk, attrs)) == shown((fg, bk, attrs))
+
+
+def test_bright_color_clears_attributes():
+    # ESC[1;34;42m would keep the underline
+    sequence = sgr_transition((None, None, UNDERLINE), (9, 2, BOLD))
+    assert cell_after(sgr_sequence(None, None, UNDERLINE), sequence) == (9, 2, BOLD)
+
+
+def test_random_transitions():
+    rng = random.Random(5)
+    for _ in range(5000):
+        old = (rng.choice(COLORS), rng.choice(COLORS), rng.choice(ATTRIBUTES))
+        new = (rng.choice(COLORS), rng.choice(COLORS), rng.choice(ATTRIBUTES))
+        assert cell_after(sgr_sequence(*old), sgr_transition(old, new)) == shown(new), (old, new)
+
+
+def test_unchanged_state_sends_nothing():
+    assert sgr_transition((4, 1, UNDERLINE), (4, 1, UNDERLINE)) == ""
@@ -0,0 +1,172 @@
+# The SGR state tracked by ansi.Terminal: what the terminal shows must match
+# fg, bk and attrs, framed output must match unframed output and repeated
+# style calls must not be sent again.
+
+import random
+
+from colorconsole.ansi_codes import CODES, COLORS_BK, COLORS_FG, ESCAPE
+from colorconsole.sgr import BOLD
+from colorconsole.virtual import Emulator, Terminal
+
+CALLS = [
+    lambda t, r: t.set_color(r.randrange(16), r.choice([None, r.randrange(16)])),
+    lambda t, r: t.set_color(None, r.randrange(16)),
+    lambda t, r: t.xterm256_set_fg_color(r.randrange(256)),
+    lambda t, r: t.xterm256_set_bk_color(r.randrange(256)),
+    lambda t, r: t.xterm24bit_set_fg_color(r.randrange(256), 10, 20),
+    lambda t, r: t.xterm24bit_set_bk_color(5, r.randrange(256), 7),
+    lambda t, r: t.underline(),
+    lambda t, r: t.underline_off(),
+    lambda t, r: t.reverse(),
+    lambda t, r: t.reverse_off(),
+    lambda t, r: t.italic(),
+    lambda t, r: t.crossed(),
+    lambda t, r: t.blink(),
+    lambda t, r: t.default_foreground(),
+    lambda t, r: t.default_background(),
+    lambda t, r: t.reset_colors(),
+]
+
+
+def shown(fg, bk, attrs):
+    if fg is not None and fg < 16 and (fg >= 8 or attrs & BOLD):
+        fg |= 8
+        attrs |= BOLD
+    return fg, bk, attrs
+
+
+def run(term, seed, framed):
+    rng = random.Random(seed)
+    if framed:
+        term.begin_frame()
+    for n in range(300):
+        for _ in range(rng.randrange(4)):
+            rng.choice(CALLS)(term, rng)
+        term.print_at(n % 40 + 1, n // 40 % 10 + 1, "x")
+        if not framed:
+            assert term.emulator.cell(n % 40, n // 40 % 10)[1:] == shown(term.fg, term.bk, term.attrs)
+    if framed:
+        term.end_frame()
+
+
+def test_tracked_style_is_shown():
+    for depth in (24, 8, 4):
+        run(Terminal(40, 10, color_depth=depth), depth, False)
+
+
+def test_framed_matches_unframed():
+    for seed in range(5):
+        framed, unframed = Terminal(40, 10), Terminal(40, 10)
+        run(framed, seed, True)
+        run(unframed, seed, False)
+        assert framed.emulator.cells == unframed.emulator.cells, seed
+
+
+class CapturingTerminal(Terminal):
+    def _send(self, text):
+        self.output += text
+        super()._send(text)
+
+    def _write_frame(self, text):
+        self.output += text
+        super()._write_frame(text)
+
+
+def test_redundant_calls_send_nothing():
+    term = CapturingTerminal(20, 5)
+    term.output = ""
+    term.set_color(4, 1)
+    term.underline()
+    sent = term.output
+    term.underline()
+    term.xterm256_set_bk_color(4)
+    term.xterm256_set_bk_color(4)
+    sent += "\x1b[48;5;4m"
+    term.set_color(None, None)
+    term.reset_colors()
+    sent += "\x1b[0m"
+    term.reset_colors()
+    assert term.output == sent
+
+
+def test_style_changes_are_merged_in_frames():
+    term = CapturingTerminal(20, 5)
+    term.output = ""
+    with term.frame():
+        term.set_color(4, 1)
+        term.underline()
+        term.reverse()
+        term.set_color(2, 1)
+        term.underline()
+        term.print("x")
+    assert term.output.count("\x1b[") == 1
+    assert term.emulator.cell(0, 0) == ("x", 2, 1, 0x08)
+
+
+# Calls with the bytes the original ansi.Terminal wrote for them
+BASELINE_CALLS = [
+    lambda r: ("set_color", (r.randrange(16), None)),
+    lambda r: ("set_color", (r.randrange(16), r.randrange(16))),
+    lambda r: ("set_color", (None, r.randrange(16))),
+    lambda r: ("underline", ()),
+    lambda r: ("underline_off", ()),
+    lambda r: ("reverse", ()),
+    lambda r: ("italic", ()),
+    lambda r: ("reset_colors", ()),
+]
+
+
+def baseline_bytes(name, args):
+    if name == "set_color":
+        fg, bk = args
+        return (ESCAPE + COLORS_FG[fg] if fg is not None else "") + (ESCAPE + COLORS_BK[bk] if bk is not None else "")
+    if name == "reset_colors":
+        return ESCAPE + "49m" + CODES["reset"]
+    return CODES[name]
+
+
+def test_tracked_style_matches_baseline_stream():
+    for seed in range(10):
+        rng = random.Random(seed)
+        term = Terminal(40, 10)
+        baseline = Emulator(40, 10)
+        for n in range(200):
+            for _ in range(rng.randrange(4)):
+                name, args = rng.choice(BASELINE_CALLS)(rng)
+                getattr(term, name)(*args)
+                baseline.feed(baseline_bytes(name, args))
+            x, y = n % 40, n // 40 % 10
+            term.print_at(x + 1, y + 1, "x")
+            baseline.feed(CODES["gotoxy"] % (y + 1, x + 1) + "x")
+            assert shown(*term.emulator.cell(x, y)[1:]) == shown(*baseline.cell(x, y)[1:]), seed
+            assert shown(term.fg, term.bk, term.attrs) == shown(baseline.fg, baseline.bk, baseline.attrs), seed
+
+
+def test_bright_colors_keep_background_and_attributes():
+    term = Terminal(20, 5)
+    term.set_color(None, 4)
+    term.underline()
+    term.set_color(14)
+    term.print("x")
+    assert term.emulator.cell(0, 0) == ("x", 14, 4, BOLD | 0x08)
+    term.set_color(2)
+    term.print("y")
+    assert term.emulator.cell(1, 0) == ("y", 2, None, 0)
+
+
+def test_cprint_many_matches_baseline_stream():
+    rng = random.Random(3)
+    segments = [
+        (rng.choice([None, rng.randrange(16)]), rng.choice([None, rng.randrange(16)]), rng.choice(["ab", "", "c"]))
+        for _ in range(300)
+    ]
+    term = Terminal(40, 20)
+    term.underline()
+    term.cprint_many(segments)
+    baseline = Emulator(40, 20)
+    baseline.feed(CODES["underline"])
+    for fg, bk, text in segments:
+        baseline.feed(baseline_bytes("set_color", (fg, bk)) + text)
+    assert [[shown(*c[1:]) + c[:1] for c in row] for row in term.emulator.cells] == [
+        [shown(*c[1:]) + c[:1] for c in row] for row in baseline.cells
+    ]
@@ -0,0 +1,20 @@
+import os
+import sys
+
+from colorconsole import ansi, terminal, virtual
+
+
+def test_redirected_stdin_keeps_real_output(monkeypatch, tmp_path):
+    path = tmp_path / "input.txt"
+    path.write_text("abc")
+    with open(path) as stdin:
+        monkeypatch.setattr(sys, "stdin", stdin)
+        term = terminal.get_terminal()
+        assert type(term) is ansi.Terminal
+        assert term.getch() == "a"
+
+
+def test_virtual_only_when_asked():
+    assert isinstance(terminal.get_terminal(virtual=True), virtual.Terminal)
+    if os.name == "posix":
+        assert type(terminal.get_terminal()) is ansi.Terminal
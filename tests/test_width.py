@@ -0,0 +1,20 @@
+from colorconsole.width import _text_width, clip, text_width, truncate
+
+
+def test_text_width():
+    assert text_width("abc") == 3
+    assert text_width("漢字") == 4
+    assert text_width("é") == 1
+
+
+def test_clip():
+    assert clip("abc", 2) == ("ab", 2)
+    assert clip("漢字", 3) == ("漢", 2)
+    assert clip("abc", 0) == ("", 0)
+    assert clip("abc", -1) == ("", 0)
+    assert clip("漢字", -1) == ("", 0)
+
+
+def test_truncate():
+    assert truncate("abcdef", 4) == "abc…"
+    assert truncate("abc", 4) == "abc"